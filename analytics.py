@@ -0,0 +1,71 @@
+# ─────────────────────────────────────────────
+# Cœur analytique commun au script, à l'application Streamlit et au mode batch
+# ─────────────────────────────────────────────
+# Rendements logarithmiques, filtre des valeurs aberrantes, statistiques par secteur,
+# VaR normale et historique, intervalle de confiance sur la moyenne.
+#
+# Démarrage rapide : les dépendances lourdes ne sont importées que par l'étape qui
+# s'en sert (yfinance au premier téléchargement, voir data_sources.YFinanceSource ;
+# matplotlib et scipy à l'appel du rendu des figures, voir figures.py). Les quantiles de
+# la loi normale viennent de statistics.NormalDist (bibliothèque standard).
+# Budget de temps d'import vérifié par : python benchmarks.py --imports
+from statistics import NormalDist
+
+import numpy as np
+
+from instrumentation import traced
+from moments import sector_moments
+from parameters import LEVELS
+from price_store import PriceStore
+from sketches import sector_sketches, ticker_sketches
+from universe import universe_tickers
+
+
+def download_log_returns(tickers, start, end, store=None):
+    """Rendements logarithmiques journaliers ; une séance n'est supprimée que si tous les titres y manquent."""
+    close = (store or PriceStore()).get_many(tickers, start, end)
+    return np.log(close / close.shift(1)).dropna(how="all")
+
+
+def quoted_sectors(log_return, sectors):
+    """(secteurs restreints aux titres ayant au moins un rendement, tickers écartés) ; un secteur vide disparaît."""
+    quoted = set(log_return.columns[log_return.notna().any()])
+    kept = {name: tuple(t for t in tickers if t in quoted) for name, tickers in sectors.items()}
+    missing = [t for t in universe_tickers(sectors) if t not in quoted]
+    return {name: tickers for name, tickers in kept.items() if tickers}, missing
+
+
+def clean_outliers(df, n_std=3):
+    """Séances dont tous les rendements disponibles sont à moins de n_std écarts-types de la moyenne du titre."""
+    return df[((np.abs((df - df.mean()) / df.std()) < n_std) | df.isna()).all(axis=1)]
+
+
+def normal_var(mean, std, level):
+    """VaR normale (quantile de rendement, valeur négative) au niveau `level`."""
+    return mean + std * NormalDist().inv_cdf(1 - level)
+
+
+@traced("analytics.sector_table")
+def sector_table(returns, sectors, levels=LEVELS, alpha=0.05):
+    """(statistiques, sketches) de chaque secteur.
+
+    Moments poolés et N, VaR normale et historique à chaque niveau, intervalle de
+    confiance à 1 - alpha sur la moyenne ; les sketches (sketches.ReturnsSketch)
+    servent aux histogrammes. returns : DataFrame ou ReturnsMatrix.
+    """
+    stats = sector_moments(returns, sectors)
+    sketches = sector_sketches(ticker_sketches(returns, universe_tickers(sectors)), sectors)
+    return risk_columns(stats, sketches, levels, alpha), sketches
+
+
+def risk_columns(stats, sketches, levels=LEVELS, alpha=0.05):
+    """Copie de stats (Mean, Std, N par secteur) complétée des VaR normale et historique et de l'IC sur la moyenne."""
+    stats = stats.copy()
+    for level in levels:
+        stats[f"VaR normale {level:.0%}"] = normal_var(stats["Mean"], stats["Std"], level)
+        stats[f"VaR historique {level:.0%}"] = [sketches[name].digest.quantile(1 - level) for name in stats.index]
+    margin = NormalDist().inv_cdf(1 - alpha / 2) * stats["Std"] / np.sqrt(stats["N"])
+    stats["IC bas"] = stats["Mean"] - margin
+    stats["IC haut"] = stats["Mean"] + margin
+    stats["Marge d'erreur"] = margin
+    return stats
@@ -0,0 +1,186 @@
+# ─────────────────────────────────────────────
+# Backtesting des VaR : séries d'exceptions, tests de Kupiec et de Christoffersen
+# ─────────────────────────────────────────────
+# Chaque série cible (un titre, ou le portefeuille équipondéré d'un secteur) reçoit
+# chaque jour une prévision de VaR calculée sur les `window` séances précédentes ;
+# une exception est une séance dont le rendement est inférieur à la VaR prévue.
+# Estimateurs (ESTIMATORS, extensible : fonction(rendements, fenêtre, niveaux) ->
+# tableau séances × cibles × niveaux) :
+# - "normal"     : moyenne et écart-type glissants, quantile de la loi normale ;
+# - "historical" : quantile glissant (interpolation linéaire, comme np.percentile) ;
+#   ces deux VaR sont celles de rolling_var.py, calculées sur la série de chaque cible
+#   (fenêtre de `window` rendements complète) et décalées d'une séance ;
+# - "ewma"       : volatilité RiskMetrics (λ = 0.94), moyenne nulle ; la fenêtre
+#                  sert de période de chauffe.
+# Tests, pour chaque (cible, méthode, niveau, fenêtre) :
+# - Kupiec (couverture inconditionnelle) : taux d'exceptions = 1 − niveau ;
+# - Christoffersen (indépendance) : une exception ne rend pas la suivante plus probable ;
+# - couverture conditionnelle : somme des deux statistiques (χ² à 2 degrés).
+# Toutes les cibles, méthodes et niveaux d'une fenêtre sont évalués en une fois sur
+# des tableaux (séances × cibles × niveaux) ; les fenêtres sont réparties sur un
+# pool de processus.
+import argparse
+import math
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import traced
+from parallel import run_tasks, worker_data
+from parameters import EWMA_LAMBDA, LEVELS
+from rolling_var import rolling_historical_var, rolling_normal_var
+
+WINDOWS = (60, 125, 250, 500, 1000)
+
+
+# ── Estimateurs de VaR glissante (prévision de la séance t avec les séances < t) ──
+def _rolling_forecast(estimate, returns, window, levels):
+    # VaR glissante de chaque cible connue en fin de séance t − 1 : séances × cibles × niveaux
+    return np.stack([estimate(returns[target], window, levels, min_periods=window).shift(1).to_numpy()
+                     for target in returns.columns], axis=1)
+
+
+def normal_forecast(returns, window, levels):
+    return _rolling_forecast(rolling_normal_var, returns, window, levels)
+
+
+def historical_forecast(returns, window, levels):
+    return _rolling_forecast(rolling_historical_var, returns, window, levels)
+
+
+def ewma_forecast(returns, window, levels, ewma_lambda=EWMA_LAMBDA):
+    # Variance RiskMetrics ; les séances sans cotation ne la modifient pas
+    variance = (returns**2).ewm(alpha=1 - ewma_lambda, adjust=False, ignore_na=True).mean().shift(1)
+    warm = returns.notna().cumsum().shift(1) >= window
+    std = np.sqrt(variance.where(warm).to_numpy())
+    z = np.array([NormalDist().inv_cdf(1 - level) for level in levels])
+    return std[:, :, None] * z
+
+
+ESTIMATORS = {"normal": normal_forecast, "historical": historical_forecast, "ewma": ewma_forecast}
+
+
+# ── Tests ──
+def _log_likelihood(failures, total, p):
+    # Log-vraisemblance de Bernoulli : failures succès sur total essais, avec la convention 0·log 0 = 0
+    p = np.clip(p, 0.0, 1.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (np.where(failures > 0, failures * np.log(p), 0.0)
+                + np.where(total - failures > 0, (total - failures) * np.log1p(-p), 0.0))
+
+
+def _chi2_sf(stat, dof):
+    # Queue de la loi du χ² à 1 ou 2 degrés de liberté (sans scipy)
+    stat = np.maximum(np.asarray(stat, dtype="float64"), 0.0)
+    if dof == 1:
+        return np.vectorize(math.erfc, otypes=["float64"])(np.sqrt(stat / 2))
+    return np.exp(-stat / 2)
+
+
+def coverage_tests(exceptions, valid, levels):
+    """Statistiques de test pour des séries d'exceptions (séances × …) ; `levels` sur le dernier axe."""
+    p = 1 - np.asarray(levels, dtype="float64")
+    n = valid.sum(axis=0)
+    x = (exceptions & valid).sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = x / n
+    lr_uc = -2 * (_log_likelihood(x, n, p) - _log_likelihood(x, n, rate))
+
+    # Transitions entre séances consécutives toutes deux évaluées
+    pair = valid[1:] & valid[:-1]
+    prev, curr = exceptions[:-1] & pair, exceptions[1:] & pair
+    n01 = (~prev & curr & pair).sum(axis=0)
+    n00 = (~prev & ~curr & pair).sum(axis=0)
+    n11 = (prev & curr).sum(axis=0)
+    n10 = (prev & ~curr).sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pi0 = n01 / (n00 + n01)
+        pi1 = n11 / (n10 + n11)
+        pi = (n01 + n11) / (n00 + n01 + n10 + n11)
+    lr_ind = -2 * (_log_likelihood(n01 + n11, n00 + n01 + n10 + n11, pi)
+                   - _log_likelihood(n01, n00 + n01, np.nan_to_num(pi0))
+                   - _log_likelihood(n11, n10 + n11, np.nan_to_num(pi1)))
+    lr_cc = lr_uc + lr_ind
+    return {"Observations": n, "Exceptions": x, "Taux d'exceptions": rate,
+            "Kupiec LR": lr_uc, "Kupiec p": _chi2_sf(lr_uc, 1),
+            "Christoffersen LR": lr_ind, "Christoffersen p": _chi2_sf(lr_ind, 1),
+            "Couverture cond. LR": lr_cc, "Couverture cond. p": _chi2_sf(lr_cc, 2)}
+
+
+# ── Grille ──
+def backtest_targets(log_return, sectors=None, tickers=None):
+    """Séries à tester : titres demandés puis portefeuille équipondéré (moyenne des rendements disponibles) de chaque secteur."""
+    tickers = list(log_return.columns) if tickers is None else list(tickers)
+    targets = log_return[tickers].copy()
+    for name, sector_tickers in (sectors or {}).items():
+        targets[name] = log_return[list(sector_tickers)].mean(axis=1)
+    return targets
+
+
+def exception_series(returns, window, method="historical", levels=LEVELS, estimators=ESTIMATORS):
+    """(VaR prévue, exceptions, séances évaluées) : tableaux séances × cibles × niveaux."""
+    forecast = estimators[method](returns, window, levels)
+    realized = returns.to_numpy(dtype="float64")[:, :, None]
+    valid = ~np.isnan(forecast) & ~np.isnan(realized)
+    return forecast, (realized < forecast) & valid, valid
+
+
+def _window_task(window):
+    returns, methods, levels, estimators = worker_data()
+    rows = []
+    for method in methods:
+        _, exceptions, valid = exception_series(returns, window, method, levels, estimators)
+        tests = coverage_tests(exceptions, valid, levels)
+        for i, target in enumerate(returns.columns):
+            for j, level in enumerate(levels):
+                rows.append({"Cible": target, "Méthode": method, "Niveau": level, "Fenêtre": window,
+                             **{name: values[i, j] for name, values in tests.items()}})
+    return rows
+
+
+@traced("backtest.backtest_grid")
+def backtest_grid(returns, methods=tuple(ESTIMATORS), levels=LEVELS, windows=WINDOWS, estimators=ESTIMATORS,
+                  max_workers=None):
+    """Tests de Kupiec et Christoffersen pour chaque (cible, méthode, niveau, fenêtre) ; returns : une colonne par cible."""
+    data = (returns, tuple(methods), tuple(levels), estimators)
+    results = run_tasks(_window_task, windows, data, max_workers)
+    table = pd.DataFrame([row for rows in results for row in rows])
+    table[["Observations", "Exceptions"]] = table[["Observations", "Exceptions"]].astype("int64")
+    return table.set_index(["Cible", "Méthode", "Niveau", "Fenêtre"]).sort_index()
+
+
+def main(argv=None):
+    from analytics import download_log_returns
+    from data_sources import make_source
+    from price_store import DEFAULT_STORE_DIR, PriceStore
+    from universe import load_sector_map, universe_tickers
+
+    parser = argparse.ArgumentParser(description="Backtesting des VaR (Kupiec, Christoffersen) par titre et secteur.")
+    parser.add_argument("start", help="Date de début (YYYY-MM-DD)")
+    parser.add_argument("end", help="Date de fin exclue (YYYY-MM-DD)")
+    parser.add_argument("--sectors", help="Correspondance secteurs (JSON/CSV)")
+    parser.add_argument("--methods", default=",".join(ESTIMATORS), help="Méthodes, séparées par des virgules")
+    parser.add_argument("--windows", default=",".join(map(str, WINDOWS)), help="Fenêtres (séances), séparées par des virgules")
+    parser.add_argument("--source", default="yfinance", help="Source de données : yfinance, synthetic[:graine] ou dir:<répertoire>")
+    parser.add_argument("--store", default=DEFAULT_STORE_DIR, help="Répertoire du stock local des cours")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de processus (défaut : nombre de cœurs)")
+    parser.add_argument("--output", help="Fichier de résultats (.csv ou .parquet)")
+    args = parser.parse_args(argv)
+
+    sectors = load_sector_map(args.sectors)
+    log_return = download_log_returns(universe_tickers(sectors), args.start, args.end,
+                                      PriceStore(args.store, make_source(args.source)))
+    table = backtest_grid(backtest_targets(log_return, sectors), args.methods.split(","), LEVELS,
+                          [int(w) for w in args.windows.split(",")], max_workers=args.workers)
+    if args.output:
+        if args.output.endswith(".parquet"):
+            table.reset_index().to_parquet(args.output, index=False)
+        else:
+            table.to_csv(args.output)
+    print(table[["Exceptions", "Taux d'exceptions", "Kupiec p", "Christoffersen p"]].to_string())
+    return table
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+# ─────────────────────────────────────────────
+# Mode batch (sans interaction) : plusieurs périodes × plusieurs regroupements sectoriels
+# ─────────────────────────────────────────────
+# Exemple :
+#   python batch.py --period 2005-01-01:2010-01-01 --period 2010-01-01:2015-01-01 \
+#                   --sectors sectors.json --output results --figures
+#   python batch.py --periods windows.csv --workers 8 --format json
+#
+# Les cours sont chargés une seule fois (stock local, voir price_store.py) pour
+# l'union des tickers et des dates ; la matrice de rendements est enregistrée sur
+# disque et relue en mémoire mappée par chaque processus du pool, qui évalue ses
+# couples (période, regroupement) sans recharger les données. Les résultats sont
+# écrits en Parquet (ou JSON) ; les figures, optionnelles, sont celles de
+# l'application (figures.py), enregistrées en PNG hors pyplot (backend Agg).
+import argparse
+import csv
+import json
+import os
+import tempfile
+
+import pandas as pd
+
+from analytics import sector_table
+from data_sources import make_source
+from figures import distribution_figure
+from moments import ticker_moments
+from parallel import pool_size, run_tasks, worker_data
+from price_store import DEFAULT_STORE_DIR, PriceStore
+from universe import ReturnsMatrix, load_sector_map, universe_tickers
+
+def parse_periods(specs=(), path=None):
+    """Périodes "début:fin" en ligne de commande et/ou fichier CSV (colonnes start, end) ou JSON ([[début, fin], …])."""
+    periods = [tuple(spec.split(":")) for spec in specs]
+    if path is not None:
+        if path.endswith(".json"):
+            with open(path) as f:
+                periods += [tuple(p) for p in json.load(f)]
+        else:
+            with open(path, newline="") as f:
+                periods += [(row["start"].strip(), row["end"].strip()) for row in csv.DictReader(f)]
+    if not periods:
+        raise ValueError("Aucune période à évaluer (--period ou --periods)")
+    for period in periods:
+        _check_period(period)
+    return periods
+
+
+def _check_period(period):
+    try:
+        valid = len(period) == 2 and pd.Timestamp(period[0]) < pd.Timestamp(period[1])
+    except ValueError:
+        valid = False
+    if not valid:
+        raise ValueError(f"Période invalide : {':'.join(map(str, period))!r} "
+                         "(attendu : début:fin, dates YYYY-MM-DD, début < fin)")
+
+
+def load_groupings(paths=()):
+    """{nom du regroupement: {secteur: tickers}} ; le nom est celui du fichier, "default" sans fichier."""
+    if not paths:
+        return {"default": load_sector_map()}
+    return {os.path.splitext(os.path.basename(p))[0]: load_sector_map(p) for p in paths}
+
+
+def evaluate(returns, start, end, grouping, sectors, figure_dir=None):
+    """Statistiques, VaR et intervalle de confiance de chaque titre et secteur sur [start, end)."""
+    window = returns.window(start, end)
+    tickers = universe_tickers(sectors)
+    key = {"start": start, "end": end, "grouping": grouping}
+
+    all_ticker_stats = ticker_moments(window, tickers)
+    ticker_stats = pd.concat([all_ticker_stats.loc[list(sector_tickers)].assign(sector=name)
+                              for name, sector_tickers in sectors.items()])
+    ticker_stats = ticker_stats.rename_axis("ticker").reset_index()
+
+    stats, sketches = sector_table(window, sectors)
+    if figure_dir is not None:
+        fig = distribution_figure(stats, sketches, title=f"{grouping} : {start} → {end}")
+        fig.savefig(os.path.join(figure_dir, f"{grouping}_{start}_{end}.png"))
+    stats = stats.rename_axis("sector").reset_index()
+    return ticker_stats.assign(**key), stats.assign(**key)
+
+
+def _evaluate_task(args):
+    return evaluate(worker_data(), *args)
+
+
+def _load_matrix(matrix_dir):
+    return ReturnsMatrix.load(matrix_dir, mmap=True)
+
+
+def run(periods, groupings, source="yfinance", store_dir=DEFAULT_STORE_DIR, output_dir="results",
+        output_format="parquet", figures=False, max_workers=None):
+    tickers = universe_tickers({(g, s): t for g, sectors in groupings.items() for s, t in sectors.items()})
+    start = min(p[0] for p in periods)
+    end = max(p[1] for p in periods)
+    # Une seule lecture des cours pour toute la campagne
+    close = PriceStore(store_dir, make_source(source)).get_many(tickers, start, end)
+    returns = ReturnsMatrix.from_prices(close)
+
+    os.makedirs(output_dir, exist_ok=True)
+    figure_dir = None
+    if figures:
+        figure_dir = os.path.join(output_dir, "figures")
+        os.makedirs(figure_dir, exist_ok=True)
+    tasks = [(s, e, grouping, sectors, figure_dir) for s, e in periods for grouping, sectors in groupings.items()]
+
+    workers = pool_size(max_workers, len(tasks))
+    if workers == 1:
+        results = run_tasks(_evaluate_task, tasks, returns, workers)
+    else:
+        # Matrice enregistrée une fois, relue en mémoire mappée par chaque processus
+        with tempfile.TemporaryDirectory() as matrix_dir:
+            returns.save(matrix_dir)
+            results = run_tasks(_evaluate_task, tasks, matrix_dir, workers, load=_load_matrix)
+
+    ticker_stats = pd.concat([r[0] for r in results], ignore_index=True)
+    sector_stats = pd.concat([r[1] for r in results], ignore_index=True)
+    for name, table in (("ticker_stats", ticker_stats), ("sector_stats", sector_stats)):
+        path = os.path.join(output_dir, f"{name}.{output_format}")
+        if output_format == "parquet":
+            table.to_parquet(path, index=False)
+        else:
+            table.to_json(path, orient="records", indent=1, force_ascii=False)
+    return ticker_stats, sector_stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyse GAFAM vs Utilities en mode batch (plusieurs périodes et regroupements).")
+    parser.add_argument("--period", action="append", default=[], help="Période début:fin (YYYY-MM-DD:YYYY-MM-DD), répétable")
+    parser.add_argument("--periods", help="Fichier de périodes : CSV (start,end) ou JSON ([[début, fin], …])")
+    parser.add_argument("--sectors", action="append", default=[], help="Correspondance secteurs (JSON/CSV), répétable ; un regroupement par fichier")
+    parser.add_argument("--source", default="yfinance", help="Source de données : yfinance, synthetic[:graine] ou dir:<répertoire>")
+    parser.add_argument("--store", default=DEFAULT_STORE_DIR, help="Répertoire du stock local des cours")
+    parser.add_argument("--output", default="results", help="Répertoire de sortie")
+    parser.add_argument("--format", choices=["parquet", "json"], default="parquet")
+    parser.add_argument("--figures", action="store_true", help="Enregistrer une figure PNG par (période, regroupement)")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de processus (défaut : nombre de cœurs)")
+    args = parser.parse_args(argv)
+
+    try:
+        periods = parse_periods(args.period, args.periods)
+    except ValueError as error:
+        parser.error(str(error))
+    groupings = load_groupings(args.sectors)
+    _, sector_stats = run(periods, groupings, args.source, args.store, args.output, args.format,
+                          args.figures, args.workers)
+    print(f"{len(periods)} période(s) × {len(groupings)} regroupement(s) évalués → {args.output}")
+    return sector_stats
+
+
+if __name__ == "__main__":
+    main()
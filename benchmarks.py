@@ -0,0 +1,229 @@
+# ─────────────────────────────────────────────
+# Benchmarks des étapes de l'analyse sur données synthétiques
+# ─────────────────────────────────────────────
+# Chaque étape (construction des log-rendements, clean_outliers, moments par titre
+# et par secteur, VaR normale et historique, intervalles de confiance, VaR EWMA de
+# portefeuille avec et sans cotations manquantes, rendu de la figure) est
+# chronométrée sur un univers synthétique reproductible (queues épaisses, voir
+# data_sources.synthetic_universe), avec le pic d'allocation mémoire mesuré par
+# tracemalloc.
+#
+#   python benchmarks.py                               # tailles small et medium
+#   python benchmarks.py --sizes small,medium,large --save   # enregistre la référence
+#   python benchmarks.py --compare                     # signale les régressions
+#   python benchmarks.py --imports                     # budget de temps d'import (démarrage à froid)
+#
+# La référence (benchmarks_baseline.json) dépend de la machine : l'enregistrer
+# sur la machine où les comparaisons seront faites. Une étape est en régression
+# si son temps dépasse la référence de plus de --tolerance (25 % par défaut) et
+# d'au moins 2 ms (bruit de mesure des étapes très courtes), ou si son pic
+# d'allocation dépasse la référence de plus de --memory-tolerance (10 % par défaut)
+# et d'au moins 64 Ko ; le code de sortie vaut alors 1.
+#
+# --imports importe chaque module d'entrée dans un processus neuf (démarrage à froid)
+# et échoue si l'import dépasse IMPORT_BUDGET secondes ou charge une dépendance
+# lourde (HEAVY_MODULES), qui ne doit l'être qu'à l'étape qui s'en sert.
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from statistics import NormalDist
+
+import numpy as np
+
+import analytics
+from bootstrap import bootstrap_confidence_intervals
+from data_sources import synthetic_universe
+from figures import distribution_figure, figure_png
+from moments import sector_moments, ticker_moments
+from portfolio_var import ewma_portfolio_var
+from sketches import sector_sketches, ticker_sketches
+from universe import ReturnsMatrix, universe_tickers
+
+# (séances, titres, secteurs) : de l'analyse actuelle (10 titres × 25 ans) à 2 000 titres
+SIZES = {
+    "small": (6300, 10, 2),
+    "medium": (6300, 500, 11),
+    "large": (6300, 2000, 11),
+}
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks_baseline.json")
+# Modules importés par les points d'entrée, budget d'import à froid (secondes) et dépendances différées
+IMPORT_MODULES = ("analytics", "figures", "batch", "bootstrap", "rolling_var", "monte_carlo", "portfolio_var", "backtest")
+IMPORT_BUDGET = 1.5
+HEAVY_MODULES = ("matplotlib", "scipy", "sklearn", "yfinance")
+
+
+def measure(func, repeat=3):
+    """(meilleur temps en secondes, pic d'allocation en octets, résultat) de func()."""
+    # Traçage déjà actif (instrumentation, RISK_PROFILE_MEMORY) : conservé, pic mesuré depuis l'allocation courante
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    result = func()
+    peak = tracemalloc.get_traced_memory()[1] - before
+    if started:
+        tracemalloc.stop()
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best, peak, result
+
+
+def stages(close, sectors):
+    """Étapes du pipeline, dans l'ordre ; chacune reçoit les résultats des précédentes."""
+    def log_returns(r):
+        return np.log(close / close.shift(1)).dropna(how="all")
+
+    def outliers(r):
+        return analytics.clean_outliers(r["log_returns"])
+
+    def returns_matrix(r):
+        return ReturnsMatrix.from_frame(r["log_returns"])
+
+    def ticker_stats(r):
+        return ticker_moments(r["returns_matrix"])
+
+    def sector_stats(r):
+        return sector_moments(r["returns_matrix"], sectors)
+
+    def normal_var(r):
+        stats = r["sector_stats"]
+        return {level: analytics.normal_var(stats["Mean"], stats["Std"], level) for level in (0.95, 0.99)}
+
+    def historical_var_percentile(r):
+        # Méthode d'origine : np.percentile sur les rendements poolés du secteur
+        return {name: np.percentile(r["returns_matrix"].pooled(t), [5, 1]) for name, t in sectors.items()}
+
+    def historical_var_sketch(r):
+        sketches = sector_sketches(ticker_sketches(r["returns_matrix"], universe_tickers(sectors)), sectors)
+        return {name: sketch.historical_var() for name, sketch in sketches.items()}
+
+    def normal_ci(r):
+        stats = r["sector_stats"]
+        margin = NormalDist().inv_cdf(0.975) * stats["Std"] / np.sqrt(stats["N"])
+        return stats["Mean"] - margin, stats["Mean"] + margin
+
+    def bootstrap_ci(r):
+        name, sector_tickers = next(iter(sectors.items()))
+        # Un seul processus : le pic mémoire des workers échapperait à tracemalloc, et le temps inclurait le démarrage du pool
+        return bootstrap_confidence_intervals(r["log_returns"], sector_tickers, n_resamples=1000, max_workers=1)
+
+    def ewma_portfolio(r):
+        # Tous les titres en un seul portefeuille (500 titres pour la taille medium)
+        return ewma_portfolio_var(r["log_returns"], list(close.columns))
+
+    def ewma_portfolio_gaps(r):
+        # 0,1 % de cotations manquantes éparses : l'ensemble des titres cotés change presque chaque séance
+        gaps = np.random.default_rng(0).random(r["log_returns"].shape) < 0.001
+        return ewma_portfolio_var(r["log_returns"].mask(gaps), list(close.columns))
+
+    def figure(r):
+        two = dict(list(sectors.items())[:2])
+        stats, sketches = analytics.sector_table(r["returns_matrix"], two)
+        # Rendu de l'application (figure + PNG)
+        return len(figure_png(distribution_figure(stats, sketches)))
+
+    return [log_returns, outliers, returns_matrix, ticker_stats, sector_stats, normal_var,
+            historical_var_percentile, historical_var_sketch, normal_ci, bootstrap_ci, ewma_portfolio,
+            ewma_portfolio_gaps, figure]
+
+
+def run(sizes, repeat=3, seed=0):
+    """{taille: {étape: {"seconds", "peak_bytes"}}}."""
+    report = {}
+    for size in sizes:
+        n_days, n_tickers, n_sectors = SIZES[size]
+        close, sectors = synthetic_universe(n_days, n_tickers, n_sectors, seed=seed)
+        results, report[size] = {}, {}
+        for stage in stages(close, sectors):
+            seconds, peak, results[stage.__name__] = measure(lambda: stage(results), repeat)
+            report[size][stage.__name__] = {"seconds": seconds, "peak_bytes": peak}
+            print(f"{size:>6} {n_days}×{n_tickers:<5} {stage.__name__:<26} {seconds * 1000:10.2f} ms "
+                  f"{peak / 2**20:10.1f} Mo")
+    return report
+
+
+def import_times(modules=IMPORT_MODULES):
+    """{module: (secondes, dépendances lourdes chargées)}, chaque import dans un processus neuf."""
+    code = ("import json, sys, time; t = time.perf_counter(); import {module}; "
+            "print(json.dumps([time.perf_counter() - t, sorted(m for m in {heavy!r} if m in sys.modules)]))")
+    times = {}
+    for module in modules:
+        output = subprocess.run([sys.executable, "-c", code.format(module=module, heavy=HEAVY_MODULES)],
+                                capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+        times[module] = tuple(json.loads(output.splitlines()[-1]))
+    return times
+
+
+def regressions(report, baseline, tolerance=0.25, min_delta=0.002, memory_tolerance=0.10, min_bytes=64 * 2**10):
+    """(taille, étape, mesure, référence, valeur) des étapes dont le temps ("seconds") dépasse la référence
+    de plus de `tolerance` et `min_delta` secondes, ou le pic mémoire ("peak_bytes") de plus de
+    `memory_tolerance` et `min_bytes` octets."""
+    limits = {"seconds": (tolerance, min_delta), "peak_bytes": (memory_tolerance, min_bytes)}
+    worse = []
+    for size, stage_report in report.items():
+        for stage, result in stage_report.items():
+            reference = baseline.get(size, {}).get(stage)
+            if not reference:
+                continue
+            for metric, (relative, absolute) in limits.items():
+                if metric in reference and result[metric] > max(reference[metric] * (1 + relative),
+                                                                reference[metric] + absolute):
+                    worse.append((size, stage, metric, reference[metric], result[metric]))
+    return worse
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks des étapes de l'analyse sur données synthétiques.")
+    parser.add_argument("--sizes", default="small,medium", help=f"Tailles, séparées par des virgules ({', '.join(SIZES)})")
+    parser.add_argument("--repeat", type=int, default=3, help="Nombre de mesures par étape (meilleur temps retenu)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Fichier de référence JSON")
+    parser.add_argument("--save", action="store_true", help="Enregistrer les résultats comme référence")
+    parser.add_argument("--compare", action="store_true", help="Comparer à la référence et signaler les régressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Tolérance relative sur le temps")
+    parser.add_argument("--memory-tolerance", type=float, default=0.10, help="Tolérance relative sur le pic mémoire")
+    parser.add_argument("--imports", action="store_true", help=f"Vérifier le budget d'import à froid ({IMPORT_BUDGET} s) et les imports différés")
+    args = parser.parse_args(argv)
+
+    if args.imports:
+        status = 0
+        for module, (seconds, heavy) in import_times().items():
+            over = seconds > IMPORT_BUDGET or heavy
+            status |= bool(over)
+            print(f"{module:<14} {seconds * 1000:8.1f} ms" + (f"  chargé : {', '.join(heavy)}" if heavy else "")
+                  + ("  HORS BUDGET" if over else ""))
+        return status
+
+    report = run(args.sizes.split(","), args.repeat, args.seed)
+    status = 0
+    if args.compare:
+        with open(args.baseline) as f:
+            worse = regressions(report, json.load(f), args.tolerance, memory_tolerance=args.memory_tolerance)
+        for size, stage, metric, reference, value in worse:
+            if metric == "seconds":
+                print(f"RÉGRESSION {size} {stage} : {reference * 1000:.2f} ms → {value * 1000:.2f} ms")
+            else:
+                print(f"RÉGRESSION MÉMOIRE {size} {stage} : {reference / 2**20:.2f} Mo → {value / 2**20:.2f} Mo")
+        status = 1 if worse else 0
+    if args.save:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(report)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=1)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+# ─────────────────────────────────────────────
+# Intervalles de confiance bootstrap : moyenne, volatilité, skewness et VaR
+# ─────────────────────────────────────────────
+# Les séances (lignes de log_return restreintes aux titres du secteur) sont
+# rééchantillonnées, ce qui conserve la dépendance entre titres d'une même séance :
+# - "iid"   : tirage indépendant des séances ;
+# - "block" : bootstrap par blocs mobiles circulaires de `block_length` séances,
+#             pour tenir compte de la dépendance temporelle (volatility clustering).
+# Un rééchantillonnage est représenté par le nombre de tirages de chaque séance.
+# Les sommes de puissances d'un rééchantillonnage (rendements décalés de la moyenne
+# de l'échantillon, pour la précision) sont alors un simple produit matriciel
+# (tirages × sommes par séance), et la VaR historique un quantile pondéré
+# calculé sur la seule queue gauche des rendements triés (une seule recherche
+# dichotomique pour tout un lot). Les rééchantillonnages sont traités par lots de
+# taille bornée en mémoire, répartis par défaut sur un processus par cœur (graines
+# issues d'une SeedSequence, résultat indépendant du découpage et du nombre de processus).
+import math
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import traced
+from moments import central_moments, moments_from_central, moments_from_sums, power_sums
+from parallel import run_tasks, worker_data
+from parameters import LEVELS
+
+STATISTICS = ["Mean", "Std", "Skewness", "VaR normale 95%", "VaR normale 99%",
+              "VaR historique 95%", "VaR historique 99%"]
+
+
+def _prepare(values, tail_factor=1.25):
+    """Sommes de puissances par séance (décalées de la moyenne) et queue gauche triée des rendements poolés."""
+    valid = ~np.isnan(values)
+    pooled = values[valid]
+    shift = pooled.mean() if len(pooled) else 0.0
+    day_sums = power_sums(values.T, shift).T
+    day, _ = np.nonzero(valid)
+    order = np.argsort(pooled, kind="stable")
+    # La VaR historique d'un rééchantillonnage se trouve presque toujours dans cette queue ;
+    # sinon le calcul bascule sur l'échantillon complet pour le rééchantillonnage concerné.
+    tail = min(len(order), int(max(1 - level for level in LEVELS) * len(order) * tail_factor) + 64)
+    return {"day_sums": day_sums, "shift": shift, "sorted_values": pooled[order], "sorted_days": day[order], "tail": tail}
+
+
+def _bincount_rows(draws, n_days, out=None):
+    counts = np.empty((len(draws), n_days), dtype=np.int32) if out is None else out
+    for r, row in enumerate(draws):
+        counts[r] = np.bincount(row, minlength=n_days)
+    return counts
+
+
+def _draw_counts(rng, n_days, size, method, block_length):
+    if method == "iid":
+        return _bincount_rows(rng.integers(0, n_days, (size, n_days), dtype=np.int32), n_days)
+    if method == "block":
+        # Période plus courte qu'un bloc : un seul bloc circulaire couvrant toutes les séances
+        block_length = min(block_length, n_days)
+        n_blocks = math.ceil(n_days / block_length)
+        # Chaque départ de bloc couvre block_length séances consécutives (circulairement) : effectifs
+        # des départs précédés des block_length - 1 derniers (fin circulaire), puis somme glissante
+        # par différence de sommes cumulées, dans des tampons préalloués (pas de copie intermédiaire)
+        cum = np.zeros((size, n_days + block_length), dtype=np.int32)
+        starts = _bincount_rows(rng.integers(0, n_days, (size, n_blocks), dtype=np.int32), n_days,
+                                out=cum[:, block_length:])
+        cum[:, 1:block_length] = starts[:, n_days - block_length + 1:]
+        np.cumsum(cum[:, 1:], axis=1, out=cum[:, 1:])
+        return np.subtract(cum[:, block_length:], cum[:, :n_days])
+    raise ValueError(f"Méthode de bootstrap inconnue : {method!r} (attendu : 'iid' ou 'block')")
+
+
+def _prefix_quantiles(counts, total, data, size, qs):
+    values, days = data["sorted_values"], data["sorted_days"]
+    # np.take copie les colonnes bien plus vite que l'indexation avancée counts[:, days]
+    cum = np.cumsum(np.take(counts, days[:size], axis=1), axis=1, dtype=np.int64)
+    pos = (total[:, None] - 1) * np.asarray(qs)[None, :]
+    lo = np.floor(pos)
+    # Valeur de rang r (0-based) de l'échantillon dupliqué = première dont le poids cumulé dépasse r
+    ranks = np.stack([lo, lo + 1], axis=2).reshape(len(counts), -1)
+    # Une seule recherche dichotomique pour tous les rééchantillonnages : chaque ligne de poids
+    # cumulés est décalée au-delà de la précédente, ce qui rend le tableau aplati croissant
+    width = cum[:, -1].max() + 1
+    offsets = np.arange(len(counts))[:, None] * width
+    cum += offsets
+    idx = np.searchsorted(cum.ravel(), (ranks + offsets).ravel(), side="right").reshape(ranks.shape)
+    idx = (idx - np.arange(len(counts))[:, None] * size).reshape(len(counts), len(qs), 2)
+    found = idx[:, :, 1] < size
+    idx = np.minimum(idx, size - 1)
+    result = values[idx[:, :, 0]] + (values[idx[:, :, 1]] - values[idx[:, :, 0]]) * (pos - lo)
+    return np.where(found, result, np.nan)
+
+
+def _weighted_quantiles(counts, total, data, qs):
+    """Quantiles (interpolation linéaire, comme np.percentile) des rendements poolés pondérés par les tirages (total : nombre de rendements tirés)."""
+    out = _prefix_quantiles(counts, total, data, data["tail"], qs)
+    # Rééchantillonnages dont le quantile sort de la queue pré-calculée : échantillon complet
+    missing = np.flatnonzero(np.isnan(out).any(axis=1))
+    if len(missing):
+        out[missing] = _prefix_quantiles(counts[missing], total[missing], data, len(data["sorted_values"]), qs)
+    return out
+
+
+def _batch_statistics(args):
+    size, seed, method, block_length = args
+    data = worker_data()
+    counts = _draw_counts(np.random.default_rng(seed), len(data["day_sums"]), size, method, block_length)
+    sums = (counts @ data["day_sums"]).T
+    mean, std, skewness, _, _ = moments_from_sums(sums, data["shift"])
+    stats = [mean, std, skewness]
+    stats += [mean + std * NormalDist().inv_cdf(1 - level) for level in LEVELS]
+    hist = _weighted_quantiles(counts, sums[0], data, [1 - level for level in LEVELS])
+    stats += [hist[:, j] for j in range(len(LEVELS))]
+    return np.stack(stats, axis=1)
+
+
+def bootstrap_distribution(log_return, sector_tickers, n_resamples=10_000, method="iid", block_length=20,
+                           seed=0, max_batch_bytes=64 * 2**20, max_workers=None):
+    """Distribution bootstrap (n_resamples × STATISTICS) des statistiques poolées du secteur (défaut : un processus par cœur)."""
+    values = log_return[list(sector_tickers)].dropna(how="all").to_numpy(dtype="float64")
+    data = _prepare(values)
+    n_days = len(values)
+    # Lot borné en mémoire : matrice de tirages (lot × séances) et sommes cumulées de la queue
+    batch = max(1, min(n_resamples, max_batch_bytes // (8 * max(n_days, data["tail"]))))
+    n_batches = math.ceil(n_resamples / batch)
+    sizes = [batch] * (n_batches - 1) + [n_resamples - batch * (n_batches - 1)]
+    seeds = np.random.SeedSequence(seed).spawn(n_batches)
+    tasks = [(size, s, method, block_length) for size, s in zip(sizes, seeds)]
+
+    results = run_tasks(_batch_statistics, tasks, data, max_workers)
+    return pd.DataFrame(np.concatenate(results), columns=STATISTICS)
+
+
+@traced("bootstrap.confidence_intervals")
+def bootstrap_confidence_intervals(log_return, sector_tickers, alpha=0.05, **kwargs):
+    """Estimation sur l'échantillon et intervalle bootstrap par percentiles à 1 - alpha pour chaque statistique."""
+    values = log_return[list(sector_tickers)].to_numpy(dtype="float64")
+    pooled = values[~np.isnan(values)]
+    mean, std, skewness, _, _ = moments_from_central(central_moments(pooled))
+    mean, std, skewness = mean[0], std[0], skewness[0]
+    estimate = [mean, std, skewness]
+    estimate += [mean + std * NormalDist().inv_cdf(1 - level) for level in LEVELS]
+    estimate += list(np.percentile(pooled, [100 * (1 - level) for level in LEVELS]))
+    distribution = bootstrap_distribution(log_return, sector_tickers, **kwargs)
+    return pd.DataFrame({
+        "Estimation": estimate,
+        "IC bas": distribution.quantile(alpha / 2).to_numpy(),
+        "IC haut": distribution.quantile(1 - alpha / 2).to_numpy(),
+    }, index=STATISTICS)
@@ -0,0 +1 @@
+# Racine du dépôt : pytest l'ajoute à sys.path, les tests importent les modules à plat (tests/)
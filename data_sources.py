@@ -0,0 +1,126 @@
+# ─────────────────────────────────────────────
+# Sources de données de marché & téléchargement concurrent
+# ─────────────────────────────────────────────
+# Une source est un objet appelable source(ticker, start, end) -> pd.Series
+# (cours de clôture indexés par date, fin exclue comme yf.download).
+# fetch_closes() interroge plusieurs tickers en parallèle (pool de threads borné,
+# nouvelles tentatives par ticker) et assemble un seul DataFrame aligné à la fin :
+# la latence suit le ticker le plus lent plutôt que la somme des tickers.
+import os
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
+def _empty(ticker):
+    return pd.Series(dtype="float64", name=ticker, index=pd.DatetimeIndex([]))
+
+
+class YFinanceSource:
+    def __init__(self, timeout=30):
+        self.timeout = timeout
+
+    def __call__(self, ticker, start, end):
+        import yfinance as yf
+        # yf.download n'est pas réentrant (résultats partagés dans un dictionnaire global du module) :
+        # Ticker.history n'utilise que l'objet Ticker de l'appel et peut tourner dans le pool de threads
+        data = yf.Ticker(ticker).history(start=start, end=end, auto_adjust=True, timeout=self.timeout)
+        if data.empty:
+            return _empty(ticker)
+        close = data["Close"]
+        # Index en heure de la place de cotation : dates naïves, comme yf.download
+        if close.index.tz is not None:
+            close.index = close.index.tz_localize(None)
+        return close.rename(ticker)
+
+
+class DirectorySource:
+    """Répertoire local contenant un fichier <ticker>.parquet ou <ticker>.csv (index Date, colonne Close)."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def __call__(self, ticker, start, end):
+        parquet = os.path.join(self.root, f"{ticker}.parquet")
+        csv = os.path.join(self.root, f"{ticker}.csv")
+        if os.path.exists(parquet):
+            close = pd.read_parquet(parquet)["Close"]
+        elif os.path.exists(csv):
+            close = pd.read_csv(csv, index_col=0, parse_dates=True)["Close"]
+        else:
+            return _empty(ticker)
+        close.index = pd.DatetimeIndex(close.index)
+        return close[(close.index >= pd.Timestamp(start)) & (close.index < pd.Timestamp(end))].rename(ticker)
+
+
+class SyntheticSource:
+    """Cours simulés (marche aléatoire à queues épaisses), reproductibles pour un même ticker et une même graine."""
+
+    def __init__(self, seed=0, mean=0.0003, std=0.015, df=4, start_price=100.0):
+        self.seed = seed
+        self.mean = mean
+        self.std = std
+        self.df = df
+        self.start_price = start_price
+
+    def __call__(self, ticker, start, end):
+        # Les dates sont générées depuis une origine fixe pour qu'une sous-plage donne les mêmes cours
+        origin = pd.Timestamp("1990-01-01")
+        dates = pd.bdate_range(origin, pd.Timestamp(end), inclusive="left")
+        rng = np.random.default_rng([self.seed, zlib.crc32(ticker.encode())])
+        shocks = rng.standard_t(self.df, size=len(dates)) * self.std / np.sqrt(self.df / (self.df - 2))
+        close = pd.Series(self.start_price * np.exp(np.cumsum(self.mean + shocks)), index=dates, name=ticker)
+        return close[close.index >= pd.Timestamp(start)]
+
+
+def synthetic_universe(n_days=6300, n_tickers=10, n_sectors=2, seed=0, df=4, start="2000-01-03"):
+    """Cours simulés d'un univers entier (séances × titres) et sa correspondance secteurs → tickers.
+
+    Chaque rendement combine un facteur sectoriel et un choc propre au titre, tous deux
+    de Student (queues épaisses) ; la volatilité propre varie d'un titre à l'autre.
+    """
+    rng = np.random.default_rng(seed)
+    tickers = [f"T{i:04d}" for i in range(n_tickers)]
+    sector_of = np.arange(n_tickers) % n_sectors
+    t_scale = np.sqrt((df - 2) / df)
+    factor = rng.standard_t(df, (n_days, n_sectors)) * 0.01 * t_scale
+    own_vol = rng.uniform(0.008, 0.025, n_tickers)
+    shocks = rng.standard_t(df, (n_days, n_tickers)) * own_vol * t_scale
+    log_return = 0.0003 + factor[:, sector_of] + shocks
+    dates = pd.bdate_range(start, periods=n_days)
+    close = pd.DataFrame(100.0 * np.exp(np.cumsum(log_return, axis=0)), index=dates, columns=tickers)
+    sectors = {f"S{s:02d}": tuple(t for t, k in zip(tickers, sector_of) if k == s) for s in range(n_sectors)}
+    return close, sectors
+
+
+def make_source(spec="yfinance"):
+    """"yfinance", "synthetic[:graine]" ou "dir:<répertoire>"."""
+    if spec == "yfinance":
+        return YFinanceSource()
+    if spec.startswith("synthetic"):
+        _, _, seed = spec.partition(":")
+        return SyntheticSource(seed=int(seed or 0))
+    if spec.startswith("dir:"):
+        return DirectorySource(spec[4:])
+    raise ValueError(f"Source de données inconnue : {spec!r}")
+
+
+def _fetch_with_retry(source, ticker, start, end, retries, backoff):
+    for attempt in range(retries + 1):
+        try:
+            return source(ticker, start, end)
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * 2 ** attempt)
+
+
+def fetch_closes(source, tickers, start, end, max_workers=8, retries=2, backoff=0.5):
+    """Cours de clôture de tous les tickers, téléchargés en parallèle puis alignés en une seule étape."""
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tickers)))) as pool:
+        futures = [pool.submit(_fetch_with_retry, source, t, start, end, retries, backoff) for t in tickers]
+        closes = [f.result() for f in futures]
+    return pd.concat([c.rename(t) for c, t in zip(closes, tickers)], axis=1).sort_index()
@@ -0,0 +1,71 @@
+# ─────────────────────────────────────────────
+# Figures partagées : distribution et VaR de chaque secteur
+# ─────────────────────────────────────────────
+# Un seul rendu pour le script, l'application, le mode batch et les benchmarks :
+# une colonne par secteur, histogramme des rendements + PDF normale en haut,
+# CDF normale + VaR normales et historiques en bas. Les histogrammes viennent des
+# sketches (sketches.py), sans relire les rendements.
+# matplotlib et scipy ne sont importés qu'à l'appel (démarrage rapide). Sans figure
+# fournie, le rendu se fait dans une Figure hors pyplot : pas d'état global partagé
+# entre les sessions Streamlit ni entre les processus du mode batch.
+import io
+
+import numpy as np
+
+from instrumentation import traced
+from parameters import LEVELS
+
+
+@traced("figures.distribution_figure")
+def distribution_figure(stats, sketches, fig=None, title=None):
+    """Figure (2 × secteurs) ; stats indexé par secteur (Mean, Std, N, VaR normale/historique), sketches {secteur: ReturnsSketch}."""
+    import matplotlib
+    from scipy.stats import norm
+
+    if fig is None:
+        from matplotlib.figure import Figure
+        fig = Figure()
+    fig.set_size_inches(6 * max(len(stats), 2), 8)
+    axes = fig.subplots(2, len(stats), squeeze=False)
+    colors = matplotlib.rcParams["axes.prop_cycle"].by_key()["color"]
+
+    for i, (name, sector) in enumerate(stats.iterrows()):
+        top, bottom = axes[0, i], axes[1, i]
+        top.set_title(f"Histogramme {name}")
+        bottom.set_title(f"CDF {name} avec VaR")
+        if sector["N"] == 0:
+            # Secteur sans aucun rendement sur la période : panneaux vides, les autres secteurs sont tracés
+            for ax in (top, bottom):
+                ax.text(0.5, 0.5, "Aucun rendement sur la période", ha="center", va="center", transform=ax.transAxes)
+            continue
+        sketch = sketches[name]
+        color = colors[i % len(colors)]
+        edges, counts = sketch.histogram.rebin(100)
+        density = np.arange(sketch.min - 0.001, sketch.max + 0.001, 0.001)
+
+        top.hist(edges[:-1], bins=edges, weights=counts, density=True, color="skyblue", alpha=0.6, label=f"Rendements {name}")
+        top.plot(density, norm.pdf(density, sector["Mean"], sector["Std"]), color=color, label="PDF Normale")
+        top.set_xlabel("Rendement Logarithmique")
+        top.set_ylabel("Densité")
+        top.legend(loc="upper left")
+
+        bottom.plot(density, norm.cdf(density, sector["Mean"], sector["Std"]), color=color, label=f"CDF {name}")
+        for level, line_color in zip(LEVELS, ("orange", "red")):
+            bottom.axvline(sector[f"VaR normale {level:.0%}"], color=line_color, linestyle="--", label=f"VaR Normale {level:.0%}")
+            bottom.axvline(sector[f"VaR historique {level:.0%}"], color=line_color, linestyle=":",
+                           label=f"VaR Historique {level:.0%}")
+        bottom.set_xlabel("Rendement Logarithmique")
+        bottom.set_ylabel("Probabilité cumulée")
+        bottom.legend(loc="lower right")
+
+    if title:
+        fig.suptitle(title)
+    fig.tight_layout()
+    return fig
+
+
+def figure_png(fig):
+    """Image PNG (octets) de la figure."""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png")
+    return buffer.getvalue()
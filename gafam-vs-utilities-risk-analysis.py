@@ -10,166 +10,124 @@
 # ────────────────────────────────────────────────────────────────  
 # 1. IMPORT DES LIBRAIRIES  
 # ────────────────────────────────────────────────────────────────  
-import matplotlib.pyplot as plt    # Pour la visualisation graphique  
-import yfinance as yf              # Pour récupérer les données financières  
+import argparse                    # Dates et correspondance secteurs en arguments (exécution sans interaction)
+from instrumentation import Sections, recorder_from_env  # Mesures par section (RISK_PROFILE=mesures.jsonl)
+recorder_from_env()
+sections = Sections()
+sections.start("1. Import des librairies")
 import numpy as np                # Manipulations numériques avancées  
-import pandas as pd               # Manipulations de données tabulaires  
-from scipy.stats import norm, skew, kurtosis  # Statistiques descriptives et distributions  
-from sklearn.linear_model import LinearRegression  # (non utilisé ici mais importé)
+import analytics                  # Cœur analytique partagé avec l'application (rendements, stats, VaR, IC)
+from moments import ticker_moments  # Moments par titre en une passe
+from bootstrap import bootstrap_confidence_intervals  # IC bootstrap (moyenne, volatilité, skew, VaR)
+from universe import ReturnsMatrix, load_sector_map, universe_tickers  # Secteurs, matrice de rendements float32 + masque
+from portfolio_var import portfolio_var_table  # VaR du portefeuille sectoriel (covariances entre titres)
+# matplotlib et scipy (graphiques) ne sont importés qu'à la section 6 : démarrage plus rapide
 
 # ────────────────────────────────────────────────────────────────  
 # 2. TÉLÉCHARGEMENT DES DONNÉES & CALCUL DES RENDEMENTS LOGARITHMIQUES  
 # ────────────────────────────────────────────────────────────────  
-def download_period(start_date, end_date):
-    tickers = ["AAPL", "MSFT", "META", "GOOG", "AMZN", 
-               "NEE", "DUK", "SO", "D", "AEP"]
-    log_return = pd.DataFrame()
-    for ticker in tickers:
-        data = yf.download(ticker, start=start_date, end=end_date)
-        data["Log_Return"] = np.log(data["Close"]/data["Close"].shift(1))
-        log_return[ticker] = data["Log_Return"].dropna()
-    return log_return
-
-start_date = input("📅 Date de début (format YYYY-MM-DD) : ")
-end_date   = input("📅 Date de fin   (format YYYY-MM-DD) : ")
+
+# Dates en arguments (python gafam-vs-utilities-risk-analysis.py 2005-01-01 2020-01-01) ou saisies au clavier ;
+# --sectors secteurs.json (ou .csv) remplace la correspondance par défaut GAFAM / Utilities.
+# Pour de nombreuses périodes sans interaction : voir batch.py
+parser = argparse.ArgumentParser(description="Analyse de performance et de risque sectorielle.")
+parser.add_argument("start_date", nargs="?", help="Date de début (YYYY-MM-DD), demandée si absente")
+parser.add_argument("end_date", nargs="?", help="Date de fin (YYYY-MM-DD), demandée si absente")
+parser.add_argument("--sectors", help="Correspondance secteurs : JSON {secteur: [tickers]} ou CSV (colonnes ticker, sector)")
+args = parser.parse_args()
+
+# Correspondance secteur → tickers (une seule source pour le téléchargement et toutes les statistiques)
+try:
+    sectors = load_sector_map(args.sectors)
+except (ValueError, KeyError) as error:
+    parser.error(f"correspondance secteurs illisible : {error}")
+
+def download_period(start_date, end_date, tickers=universe_tickers(sectors)):
+    # Tickers servis en parallèle depuis le stock local (seules les dates absentes sont téléchargées),
+    # puis alignés en une seule fois
+    return analytics.download_log_returns(tickers, start_date, end_date)
+
+start_date = args.start_date or input("📅 Date de début (format YYYY-MM-DD) : ")
+end_date   = args.end_date or input("📅 Date de fin   (format YYYY-MM-DD) : ")
+sections.start("2. Téléchargement & rendements")
 log_return = download_period(start_date, end_date)
+# Tickers sans aucune cotation sur la période (ex. introduits après la date de fin) : écartés de l'analyse
+sectors, missing = analytics.quoted_sectors(log_return, sectors)
+if missing:
+    print(f"Aucun cours sur la période, tickers ignorés : {', '.join(missing)}")
+if not sectors:
+    parser.exit(1, f"Aucun cours entre {start_date} et {end_date} pour les tickers demandés : analyse impossible\n")
+log_return = log_return[universe_tickers(sectors)]
+# Chaque titre conserve tout son historique : les séances manquantes sont masquées, pas supprimées
+returns = ReturnsMatrix.from_frame(log_return)
+sections.current.rows = len(log_return)
 
 # ────────────────────────────────────────────────────────────────  
 # 3. STATISTIQUES DESCRIPTIVES PAR TITRE ET SECTEUR  
 # ────────────────────────────────────────────────────────────────  
 
-# Statistiques par action dans le secteur GAFAM  
-Gafam = pd.DataFrame()
-Gafam["Mean"]     = log_return[["AAPL", "MSFT", "META", "GOOG", "AMZN"]].mean()
-Gafam["Std"]      = log_return[["AAPL", "MSFT", "META", "GOOG", "AMZN"]].std()
-Gafam["Skewness"] = log_return[["AAPL", "MSFT", "META", "GOOG", "AMZN"]].skew()
-Gafam["Kurtosis"] = log_return[["AAPL", "MSFT", "META", "GOOG", "AMZN"]].kurtosis()
-
-# Statistiques par action dans le secteur Utilities  
-Utilities = pd.DataFrame()
-Utilities["Mean"]     = log_return[["NEE", "DUK", "SO", "D", "AEP"]].mean()
-Utilities["Std"]      = log_return[["NEE", "DUK", "SO", "D", "AEP"]].std()
-Utilities["Skewness"] = log_return[["NEE", "DUK", "SO", "D", "AEP"]].skew()
-Utilities["Kurtosis"] = log_return[["NEE", "DUK", "SO", "D", "AEP"]].kurtosis()
-
-# Statistiques agrégées par secteur  
-gafam_total_log_return = log_return[["AAPL", "MSFT", "META", "GOOG", "AMZN"]].stack()
-Gafam_sector = pd.DataFrame({
-    "Mean":     [gafam_total_log_return.mean()],
-    "Std":      [gafam_total_log_return.std()],
-    "Skewness": [gafam_total_log_return.skew()],
-    "Kurtosis": [gafam_total_log_return.kurtosis()]
-}, index=["Gafam_sector"])
-
-Utilities_total_log_return = log_return[["NEE", "DUK", "SO", "D", "AEP"]].stack()
-Utilities_sector = pd.DataFrame({
-    "Mean":     [Utilities_total_log_return.mean()],
-    "Std":      [Utilities_total_log_return.std()],
-    "Skewness": [Utilities_total_log_return.skew()],
-    "Kurtosis": [Utilities_total_log_return.kurtosis()]
-}, index=["Utilities"])
+sections.start("3. Statistiques descriptives", rows=len(log_return))
+
+# Statistiques par action, secteur par secteur : une seule passe sur les moments de chaque titre
+ticker_stats = {name: ticker_moments(returns, sector_tickers) for name, sector_tickers in sectors.items()}
+
+# Statistiques agrégées par secteur, déduites des moments des titres (sans empiler les rendements), avec
+# VaR et intervalles de confiance (sections 4 et 5). Distribution poolée de chaque secteur (VaR historique,
+# histogrammes) : résumés construits une fois par titre puis fusionnés, sans empiler les rendements
+sector_stats, sketches = analytics.sector_table(returns, sectors)
 
 # ────────────────────────────────────────────────────────────────  
 # 4. CALCUL DE LA VaR (Value at Risk)  
 # ────────────────────────────────────────────────────────────────  
 
-# VaR à 95% et 99% pour chaque secteur, basée sur la distribution normale
-Gafam_sector["VaR (normale) à 95%"] = norm.ppf(0.05, Gafam_sector["Mean"], Gafam_sector["Std"])
-Gafam_sector["VaR (normale) à 99%"] = norm.ppf(0.01, Gafam_sector["Mean"], Gafam_sector["Std"])
-Utilities_sector["VaR (normale) à 95%"] = norm.ppf(0.05, Utilities_sector["Mean"], Utilities_sector["Std"])
-Utilities_sector["VaR (normale) à 99%"] = norm.ppf(0.01, Utilities_sector["Mean"], Utilities_sector["Std"])
-# Calcul VaR historique Utilities 95% et 99% 
-Gafam_sector["VaR (historique) à 95%"] = -np.percentile(gafam_total_log_return, 5)
-Gafam_sector["VaR (historique) à 99%"] = -np.percentile(gafam_total_log_return, 1)
-Utilities_sector["VaR (historique) à 95%"] = -np.percentile(Utilities_total_log_return, 5)
-Utilities_sector["VaR (historique) à 99%"] = -np.percentile(Utilities_total_log_return, 1)
+sections.start("4. VaR", rows=len(log_return))
 
+# VaR à 95% et 99% pour chaque secteur (analytics.sector_table), en rendement (valeurs négatives) :
+# - normale : quantile de la loi normale de moyenne et écart-type du secteur ;
+# - historique : quantile de la distribution poolée du secteur (t-digest)
+print(sector_stats[[f"VaR {method} {level}%" for method in ("normale", "historique") for level in (95, 99)]].to_string())
 
+# VaR normale du portefeuille équipondéré de chaque secteur : σ² = wᵀ Σ w tient compte des corrélations
+# entre titres, contrairement aux rendements poolés (voir portfolio_var.py pour la covariance EWMA)
+print("\nVaR du portefeuille sectoriel équipondéré :")
+print(portfolio_var_table(log_return, sectors).to_string())
 
-# ────────────────────────────────────────────────────────────────  
-# 5. INTERVALLES DE CONFIANCE SUR LA MOYENNE  
-# ────────────────────────────────────────────────────────────────  
 
-alpha = 0.05  # niveau de confiance 95%
-z = norm.ppf(1 - alpha/2)  # quantile de la loi normale
-
-# Gafam  
-mean_gafam = Gafam_sector["Mean"].values[0]
-std_gafam = Gafam_sector["Std"].values[0]
-n_gafam = gafam_total_log_return.shape[0]
-margin_error_gafam = z * (std_gafam / (n_gafam**0.5))
-IC_left_gafam = mean_gafam - margin_error_gafam
-IC_right_gafam = mean_gafam + margin_error_gafam
-print(f"Intervalle de confiance à 95% Gafam : [{IC_left_gafam:.6f} ; {IC_right_gafam:.6f}]")
-print(f"Marge d'erreur Gafam : {margin_error_gafam:.6f}")
-
-# Utilities  
-mean_utilities = Utilities_sector["Mean"].values[0]
-std_utilities = Utilities_sector["Std"].values[0]
-n_utilities = Utilities_total_log_return.shape[0]
-margin_error_utilities = z * (std_utilities / (n_utilities**0.5))
-IC_left_utilities = mean_utilities - margin_error_utilities
-IC_right_utilities = mean_utilities + margin_error_utilities
-print(f"Intervalle de confiance à 95% Utilities : [{IC_left_utilities:.6f} ; {IC_right_utilities:.6f}]")
-print(f"Marge d'erreur Utilities : {margin_error_utilities:.6f}")
 
 # ────────────────────────────────────────────────────────────────  
-# 6. VISUALISATIONS : DISTRIBUTIONS & VaR  
+# 5. INTERVALLES DE CONFIANCE SUR LA MOYENNE  
 # ────────────────────────────────────────────────────────────────  
 
-density_gafam = np.arange(gafam_total_log_return.min() - 0.001, gafam_total_log_return.max() + 0.001, 0.001)
-density_utilities = np.arange(Utilities_total_log_return.min() - 0.001, Utilities_total_log_return.max() + 0.001, 0.001)
+sections.start("5. Intervalles de confiance", rows=len(log_return))
 
-gafam_pdf = norm.pdf(density_gafam, Gafam_sector["Mean"], Gafam_sector["Std"])
-gafam_cdf = norm.cdf(density_gafam, Gafam_sector["Mean"], Gafam_sector["Std"])
-utilities_pdf = norm.pdf(density_utilities, Utilities_sector["Mean"], Utilities_sector["Std"])
-utilities_cdf = norm.cdf(density_utilities, Utilities_sector["Mean"], Utilities_sector["Std"])
+# IC à 95% : moyenne ± z · écart-type / √N, calculés par analytics.sector_table (alpha = 0.05)
+for sector_name, sector in sector_stats.iterrows():
+    print(f"Intervalle de confiance à 95% {sector_name} : [{sector['IC bas']:.6f} ; {sector['IC haut']:.6f}]")
+    margin_error = sector["Marge d'erreur"]
+    print(f"Marge d'erreur {sector_name} : {margin_error:.6f}")
 
-plt.figure(figsize=(10, 5))
+# Intervalles bootstrap par blocs (10 000 rééchantillonnages) : ne supposent pas la normalité
+# et tiennent compte de la dépendance temporelle des rendements
+for sector_name, sector_tickers in sectors.items():
+    print(f"\nIntervalles bootstrap à 95% {sector_name} :")
+    print(bootstrap_confidence_intervals(log_return, sector_tickers, method="block"))
 
-# Histogramme des rendements GAFAM avec PDF normale
-plt.subplot(2, 2, 1)
-plt.hist(gafam_total_log_return, bins=100, density=True, color="skyblue", alpha=0.6, label="Rendements GAFAM")
-plt.plot(density_gafam, gafam_pdf, label="PDF Normale", color="blue")
-plt.title("Histogramme & PDF des Rendements GAFAM")
-plt.xlabel("Rendement Logarithmique")
-plt.ylabel("Densité")
-plt.legend()
+# ────────────────────────────────────────────────────────────────  
+# 6. VISUALISATIONS : DISTRIBUTIONS & VaR  
+# ────────────────────────────────────────────────────────────────  
 
-# Histogramme des rendements Utilities avec PDF normale
-plt.subplot(2, 2, 2)
-plt.hist(Utilities_total_log_return, bins=100, density=True, color="skyblue", alpha=0.6, label="Rendements Utilities")
-plt.plot(density_utilities, utilities_pdf, label="PDF Normale", color="green")
-plt.title("Histogramme & PDF des Rendements Utilities")
-plt.xlabel("Rendement Logarithmique")
-plt.ylabel("Densité")
-plt.legend()
+# Le temps écoulé inclut l'affichage des fenêtres (plt.show) ; le temps CPU ne compte que le rendu
+sections.start("6. Visualisations")
+import matplotlib.pyplot as plt    # Pour la visualisation graphique (import différé)
+from scipy.stats import norm       # Densité et fonction de répartition de la loi normale
 
-# CDF des rendements GAFAM avec lignes VaR 95% et 99% (normale + historique)
-plt.subplot(2, 2, 3)
-plt.plot(density_gafam, gafam_cdf, label="CDF GAFAM", color="blue")
-plt.axvline(Gafam_sector["VaR (normale) à 95%"].values[0], color="orange", linestyle="--", label="VaR Normale 95%")
-plt.axvline(Gafam_sector["VaR (normale) à 99%"].values[0], color="red", linestyle="--", label="VaR Normale 99%")
-plt.axvline(-Gafam_sector["VaR (historique) à 95%"].values[0], color="orange", linestyle=":", label="VaR Historique 95%")
-plt.axvline(-Gafam_sector["VaR (historique) à 99%"].values[0], color="red", linestyle=":", label="VaR Historique 99%")
-plt.title("Fonction de Répartition (CDF) GAFAM avec VaR")
-plt.xlabel("Rendement Logarithmique")
-plt.ylabel("Probabilité cumulée")
-plt.legend()
+from figures import distribution_figure  # Figure partagée avec l'application et le mode batch
 
-# CDF des rendements Utilities avec lignes VaR 95% et 99% (normale + historique)
-plt.subplot(2, 2, 4)
-plt.plot(density_utilities, utilities_cdf, label="CDF Utilities", color="green")
-plt.axvline(Utilities_sector["VaR (normale) à 95%"].values[0], color="orange", linestyle="--", label="VaR Normale 95%")
-plt.axvline(Utilities_sector["VaR (normale) à 99%"].values[0], color="red", linestyle="--", label="VaR Normale 99%")
-plt.axvline(-Utilities_sector["VaR (historique) à 95%"].values[0], color="orange", linestyle=":", label="VaR Historique 95%")
-plt.axvline(-Utilities_sector["VaR (historique) à 99%"].values[0], color="red", linestyle=":", label="VaR Historique 99%")
-plt.title("Fonction de Répartition (CDF) Utilities avec VaR")
-plt.xlabel("Rendement Logarithmique")
-plt.ylabel("Probabilité cumulée")
-plt.legend()
+plotted = list(sectors)
+colors = plt.rcParams["axes.prop_cycle"].by_key()["color"]
 
-plt.tight_layout()
+# Par secteur : histogramme des rendements avec PDF normale, CDF avec lignes VaR 95% et 99% (normale + historique)
+distribution_figure(sector_stats, sketches, fig=plt.figure())
 plt.show()
 
 
@@ -177,27 +135,32 @@ plt.show()
 # 7. COMPARAISON DIRECTE DES VaR 95% et 99% ENTRE SECTEURS  
 # ────────────────────────────────────────────────────────────────  
 
-plt.figure(figsize=(10, 5))
+sections.start("7. Comparaison des VaR")
 
-plt.plot(density_gafam, gafam_cdf, label="CDF GAFAM", color="purple")
-plt.axvline(Gafam_sector["VaR (normale) à 99%"].values[0], color="purple", linestyle="--", label="VaR Normale 99% GAFAM")
-plt.axvline(-Gafam_sector["VaR (historique) à 99%"].values[0], color="purple", linestyle=":", label="VaR Historique 99% GAFAM")
-plt.axvline(Gafam_sector["VaR (normale) à 95%"].values[0], color="orange", linestyle="--", label="VaR Normale 95% GAFAM")
-plt.axvline(-Gafam_sector["VaR (historique) à 95%"].values[0], color="orange", linestyle=":", label="VaR Historique 95% GAFAM")
+# Grille de rendements et loi normale ajustée de chaque secteur
+density = {name: np.arange(sketches[name].min - 0.001, sketches[name].max + 0.001, 0.001) for name in plotted}
+cdf = {name: norm.cdf(density[name], sector_stats.loc[name, "Mean"], sector_stats.loc[name, "Std"]) for name in plotted}
 
-plt.plot(density_utilities, utilities_cdf, label="CDF Utilities", color="green")
-plt.axvline(Utilities_sector["VaR (normale) à 99%"].values[0], color="green", linestyle="--", label="VaR Normale 99% Utilities")
-plt.axvline(-Utilities_sector["VaR (historique) à 99%"].values[0], color="green", linestyle=":", label="VaR Historique 99% Utilities")
-plt.axvline(Utilities_sector["VaR (normale) à 95%"].values[0], color="red", linestyle="--", label="VaR Normale 95% Utilities")
-plt.axvline(-Utilities_sector["VaR (historique) à 95%"].values[0], color="red", linestyle=":", label="VaR Historique 95% Utilities")
+plt.figure(figsize=(10, 5))
 
-plt.title("Comparaison des VaR Normale & Historique (95% & 99%) entre GAFAM et Utilities")
+# Une couleur par secteur : VaR normale en tirets, historique en pointillés (99% épais, 95% fin)
+for i, name in enumerate(plotted):
+    sector = sector_stats.loc[name]
+    color = colors[i % len(colors)]
+    plt.plot(density[name], cdf[name], label=f"CDF {name}", color=color)
+    plt.axvline(sector["VaR normale 99%"], color=color, linestyle="--", linewidth=2, label=f"VaR Normale 99% {name}")
+    plt.axvline(sector["VaR historique 99%"], color=color, linestyle=":", linewidth=2, label=f"VaR Historique 99% {name}")
+    plt.axvline(sector["VaR normale 95%"], color=color, linestyle="--", linewidth=1, label=f"VaR Normale 95% {name}")
+    plt.axvline(sector["VaR historique 95%"], color=color, linestyle=":", linewidth=1, label=f"VaR Historique 95% {name}")
+
+plt.title("Comparaison des VaR Normale & Historique (95% & 99%) entre secteurs")
 plt.xlabel("Rendement Logarithmique")
 plt.ylabel("Probabilité cumulée")
 plt.legend()
 plt.grid(True)
 plt.show()
+sections.stop()
 
 
 
-print( Gafam_sector["VaR (historique) à 95%"] )
+print( -sector_stats["VaR historique 95%"] )
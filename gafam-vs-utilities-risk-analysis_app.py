@@ -2,12 +2,24 @@
 # Streamlit App ( to run the app : "streamlit run gafam-vs-utilities-risk-analysis_app.py")
 #--------------------------------------------------------#
 import streamlit as st
-import matplotlib.pyplot as plt
-import yfinance as yf
 import numpy as np
 import pandas as pd
-from scipy.stats import norm
 import datetime
+import os
+from instrumentation import Recorder, Sections, set_recorder
+# Cœur analytique partagé avec le script ; matplotlib et scipy ne sont importés qu'au rendu des graphiques
+import analytics
+from figures import distribution_figure, figure_png
+from moments import STAT_COLUMNS, ticker_moments
+from rolling_var import rolling_var
+from monte_carlo import monte_carlo_table
+from portfolio_var import ewma_portfolio_var, portfolio_var_table
+from backtest import backtest_grid, backtest_targets
+from bootstrap import bootstrap_confidence_intervals
+from universe import load_sector_map, universe_tickers
+
+# Nombre maximal de résultats conservés par étape (éviction LRU au-delà)
+CACHE_ENTRIES = 32
 
 # ─────────────────────────────────────────────
 # App layout et paramètres
@@ -22,98 +34,107 @@ En observant concrètement leurs données de marché, découvrons ensemble si ce
 st.sidebar.header("Paramètres")
 start_date = st.sidebar.date_input("Date de début", value=pd.to_datetime("2000-05-31"))
 end_date = st.sidebar.date_input("Date de fin", value=datetime.date.today())
+n_scenarios = st.sidebar.select_slider("Scénarios Monte Carlo", options=[100_000, 1_000_000, 10_000_000], value=1_000_000)
+var_window = st.sidebar.slider("Fenêtre de la VaR glissante (jours)", min_value=50, max_value=1000, value=250, step=10)
+sector_file = st.sidebar.file_uploader("Correspondance secteurs (JSON {secteur: [tickers]} ou CSV ticker,sector)",
+                                       type=["json", "csv"], help="Par défaut : GAFAM et Utilities")
+diagnostics = st.sidebar.checkbox("Diagnostics (temps par section)", value=False)
+memory_diagnostics = diagnostics and st.sidebar.checkbox("Mesurer aussi le pic mémoire (tracemalloc, ralentit l'exécution)",
+                                                         value=False)
+
+# Mesures par section et par calcul : activées par la case ci-dessus ou par RISK_PROFILE=<fichier.jsonl>
+# (les mesures y sont alors ajoutées en JSON lines). Désactivées, les spans ne coûtent presque rien.
+# L'enregistreur d'une exécution interrompue (exception, st.stop, nouvelle exécution) est fermé ici,
+# ce qui arrête tracemalloc s'il n'est plus utilisé.
+previous_recorder = st.session_state.pop("recorder", None)
+if previous_recorder is not None:
+    previous_recorder.close()
+profile_path = os.environ.get("RISK_PROFILE")
+memory = memory_diagnostics or os.environ.get("RISK_PROFILE_MEMORY", "") not in ("", "0")
+recorder = set_recorder(Recorder(profile_path, memory=memory) if diagnostics or profile_path else None)
+st.session_state["recorder"] = recorder
+sections = Sections()
 
 # ─────────────────────────────────────────────
 # Téléchargement des données et rendements log
 # ─────────────────────────────────────────────
 st.header("1. Données de marché & Rendements log")
-tickers = ["AAPL", "MSFT", "META", "GOOG", "AMZN", "NEE", "DUK", "SO", "D", "AEP"]
-
+sections.start("1. Données de marché & rendements")
+try:
+    sectors = load_sector_map(sector_file)
+except (ValueError, KeyError) as error:
+    st.error(f"Correspondance secteurs illisible : {error}")
+    st.stop()
+if sector_file is not None:
+    st.info("Les commentaires « Insight » décrivent l'analyse par défaut (GAFAM vs Utilities).")
+tickers = universe_tickers(sectors)
+
+# Chaque étape est mise en cache (clé = hash des arguments) : un changement de paramètre
+# ne recalcule que les étapes dont les entrées ont réellement changé.
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
 def download_clean_log_returns(tickers, start_date, end_date):
-    df = yf.download(tickers, start=start_date, end=end_date)["Close"]
-    log_return = np.log(df / df.shift(1)).dropna()
-    return log_return
+    # Lecture depuis le stock local ; seules les dates manquantes sont téléchargées.
+    # Chaque titre garde tout son historique : une valeur manquante (ex. META avant 2012) ne supprime pas la séance
+    return analytics.download_log_returns(tickers, start_date, end_date)
 
 log_return = download_clean_log_returns(tickers, start_date, end_date)
+# Tickers sans aucune cotation sur la période (ex. introduits après la date de fin) : écartés de l'analyse
+sectors, missing = analytics.quoted_sectors(log_return, sectors)
+if missing:
+    st.warning(f"Aucun cours sur la période, tickers ignorés : {', '.join(missing)}")
+if not sectors:
+    st.stop()
+log_return = log_return[universe_tickers(sectors)]
 st.dataframe(log_return.tail(), use_container_width=True)
 st.markdown("ℹ️ **Insight :** Les rendements journaliers logarithmiques permettent de comparer de manière homogène les variations de prix entre les GAFAM et Utilities.")
 
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
 def clean_outliers(df, n_std=3):
-    return df[(np.abs((df - df.mean()) / df.std()) < n_std).all(axis=1)]
+    return analytics.clean_outliers(df, n_std)
 
 log_return_clean = clean_outliers(log_return)
+sections.stop(rows=len(log_return))
 
 # ─────────────────────────────────────────────
 # Statistiques descriptives
 # ─────────────────────────────────────────────
 st.header("2. Statistiques descriptives")
+sections.start("2. Statistiques descriptives", rows=len(log_return))
 
 # Stats individuelles
-Gafam = pd.DataFrame({
-    "Mean": log_return[["AAPL", "MSFT", "META", "GOOG", "AMZN"]].mean(),
-    "Std": log_return[["AAPL", "MSFT", "META", "GOOG", "AMZN"]].std(),
-    "Skewness": log_return[["AAPL", "MSFT", "META", "GOOG", "AMZN"]].skew(),
-    "Kurtosis": log_return[["AAPL", "MSFT", "META", "GOOG", "AMZN"]].kurtosis()
-})
-
-Utilities = pd.DataFrame({
-    "Mean": log_return[["NEE", "DUK", "SO", "D", "AEP"]].mean(),
-    "Std": log_return[["NEE", "DUK", "SO", "D", "AEP"]].std(),
-    "Skewness": log_return[["NEE", "DUK", "SO", "D", "AEP"]].skew(),
-    "Kurtosis": log_return[["NEE", "DUK", "SO", "D", "AEP"]].kurtosis()
-})
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def ticker_stats(log_return, sector_tickers):
+    return ticker_moments(log_return, sector_tickers)
 
-st.subheader("GAFAM")
-st.dataframe(Gafam)
-st.subheader("Utilities")
-st.dataframe(Utilities)
+for sector_name, sector_tickers in sectors.items():
+    st.subheader(sector_name)
+    st.dataframe(ticker_stats(log_return, sector_tickers))
 st.markdown("ℹ️ **Insight :** Les GAFAM affichent des rendements journaliers moyens plus élevés que les Utilities, mais avec une dispersion plus marquée autour de cette moyenne, traduisant une volatilité plus accru à court terme.")
 
-# Agrégation secteur
-Gafam_sector = log_return[["AAPL", "MSFT", "META", "GOOG", "AMZN"]].stack()
-Utilities_sector = log_return[["NEE", "DUK", "SO", "D", "AEP"]].stack()
+# Agrégation secteur : statistiques poolées déduites des sommes par ticker, sans .stack(), VaR et IC compris ;
+# résumés fusionnables (t-digest + histogramme) construits une fois par titre puis fusionnés par secteur
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def sector_stats(log_return, sectors):
+    return analytics.sector_table(log_return, sectors)
 
-gafam_stat = pd.DataFrame({
-    "Mean": [Gafam_sector.mean()],
-    "Std": [Gafam_sector.std()],
-    "Skewness": [Gafam_sector.skew()],
-    "Kurtosis": [Gafam_sector.kurtosis()]
-}, index=["GAFAM"])
-
-utilities_stat = pd.DataFrame({
-    "Mean": [Utilities_sector.mean()],
-    "Std": [Utilities_sector.std()],
-    "Skewness": [Utilities_sector.skew()],
-    "Kurtosis": [Utilities_sector.kurtosis()]
-}, index=["Utilities"])
+all_sector_stats, sketches = sector_stats(log_return, sectors)
 
 st.subheader("Agrégation par secteur")
-st.dataframe(pd.concat([gafam_stat, utilities_stat]))
+st.dataframe(all_sector_stats[STAT_COLUMNS + ["N"]])
 st.markdown("ℹ️ **Insight :** L’agrégation confirme ce qui appraissaient à l'échelle individuelle (rendements moyens quotidiens plus élévés,plus volatile). Toutefois, la skewness et le kurtosis sectoriel élévé nous permettent de compléter notre analyse en comprenant que la meilleure performance moyenne des GAFAM est en partie due à des hausses extrêmes qui sont rares, mais néanmmoins plus fréquentes que pour les Utilities. Leur rendement est donc plus irrégulier mais potentiellement plus explosif que celui des Utilities, qui affichent une performance plus stable.")
 # ─────────────────────────────────────────────
 # Value at Risk (VaR) - normale et empirique
 # ─────────────────────────────────────────────
 st.header("3. Value at Risk (VaR)")
+sections.start("3. Value at Risk", rows=len(log_return))
 
-# VaR normale théorique
-gafam_stat["VaR à 95%"] = norm.ppf(0.05, gafam_stat["Mean"], gafam_stat["Std"])
-gafam_stat["VaR à 99%"] = norm.ppf(0.01, gafam_stat["Mean"], gafam_stat["Std"])
-utilities_stat["VaR à 95%"] = norm.ppf(0.05, utilities_stat["Mean"], utilities_stat["Std"])
-utilities_stat["VaR à 99%"] = norm.ppf(0.01, utilities_stat["Mean"], utilities_stat["Std"])
-
-# VaR empirique (historique)
-gafam_VaR_95_emp = np.percentile(Gafam_sector, 5)
-gafam_VaR_99_emp = np.percentile(Gafam_sector, 1)
-utilities_VaR_95_emp = np.percentile(Utilities_sector, 5)
-utilities_VaR_99_emp = np.percentile(Utilities_sector, 1)
-
-# DataFrame combinée VaR normale et historique
+# VaR normale théorique et VaR empirique (lue dans le t-digest du secteur), déjà calculées avec les statistiques
 VaR_comparative = pd.DataFrame({
-    "VaR 95% Normale": [gafam_stat["VaR à 95%"].values[0], utilities_stat["VaR à 95%"].values[0]],
-    "VaR 95% Historique": [gafam_VaR_95_emp, utilities_VaR_95_emp],
-    "VaR 99% Normale": [gafam_stat["VaR à 99%"].values[0], utilities_stat["VaR à 99%"].values[0]],
-    "VaR 99% Historique": [gafam_VaR_99_emp, utilities_VaR_99_emp]
-}, index=["GAFAM", "Utilities"])
+    "VaR 95% Normale": all_sector_stats["VaR normale 95%"],
+    "VaR 95% Historique": all_sector_stats["VaR historique 95%"],
+    "VaR 99% Normale": all_sector_stats["VaR normale 99%"],
+    "VaR 99% Historique": all_sector_stats["VaR historique 99%"],
+})
 
 st.subheader("Comparaison VaR normale vs historique")
 st.dataframe(VaR_comparative)
@@ -124,70 +145,104 @@ st.markdown("""
 - La VaR empirique prend en compte la distribution réelle des rendements passés et peut différer de la VaR calculée sous hypothèse que les rendements suivent une distribution normale.  
 - Pour un même niveau de risque, les Utilities affichent une Value at Risk (VaR) moins extrême que les GAFAM. En cas de choc de marché, les pertes maximales attendues sont plus importantes pour les GAFAM. Cela confirme leur nature plus risquée en situation extrême.""")
 
+# VaR Monte Carlo : scénarios générés par blocs et répartis sur plusieurs processus
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner="Simulation Monte Carlo…")
+def sector_monte_carlo(log_return, sectors, n_scenarios):
+    return monte_carlo_table(log_return, sectors, n_scenarios=n_scenarios)
+
+st.subheader("VaR Monte Carlo & Expected Shortfall (portefeuille équipondéré)")
+st.dataframe(sector_monte_carlo(log_return, sectors, n_scenarios))
+st.markdown("ℹ️ **Insight :** L'Expected Shortfall mesure la perte moyenne au-delà de la VaR. Le modèle de Student et le bootstrap filtré, qui reproduisent les queues épaisses et la dépendance entre titres, donnent des pertes extrêmes plus sévères que l'hypothèse normale, surtout à 99 %.")
+
+# VaR du portefeuille sectoriel : la covariance entre titres est prise en compte (diversification)
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def sector_portfolio_var(log_return, sectors):
+    return portfolio_var_table(log_return, sectors)
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def sector_ewma_var(log_return, sector_tickers):
+    return ewma_portfolio_var(log_return, sector_tickers)
+
+st.subheader("VaR du portefeuille sectoriel équipondéré (covariances entre titres)")
+portfolio_VaR = sector_portfolio_var(log_return, sectors)
+st.dataframe(pd.DataFrame({
+    "VaR 95% poolée": all_sector_stats["VaR normale 95%"],
+    "VaR 95% portefeuille": portfolio_VaR["VaR normale 95%"],
+    "VaR 99% poolée": all_sector_stats["VaR normale 99%"],
+    "VaR 99% portefeuille": portfolio_VaR["VaR normale 99%"],
+}))
+for column, (sector_name, sector_tickers) in zip(st.columns(len(sectors)), sectors.items()):
+    with column:
+        st.markdown(f"**{sector_name} : VaR EWMA (λ = 0,94)**")
+        st.line_chart(sector_ewma_var(log_return, sector_tickers).drop(columns="Volatilité EWMA"))
+st.markdown("ℹ️ **Insight :** Empiler les rendements revient à traiter chaque titre comme une observation indépendante. Le portefeuille sectoriel tient compte des corrélations : la diversification réduit sa VaR par rapport à la VaR poolée, d'autant moins que les titres du secteur évoluent ensemble. La covariance EWMA réagit rapidement aux chocs de volatilité.")
+
+# VaR glissante : fenêtres mises à jour de façon incrémentale (sommes cumulées + fenêtre triée)
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def sector_rolling_var(log_return, sector_tickers, window):
+    return rolling_var(log_return[list(sector_tickers)], window=window).dropna(how="all")
+
+st.subheader(f"VaR glissante sur {var_window} jours")
+for column, (sector_name, sector_tickers) in zip(st.columns(len(sectors)), sectors.items()):
+    with column:
+        st.markdown(f"**{sector_name}**")
+        st.line_chart(sector_rolling_var(log_return, sector_tickers, var_window))
+st.markdown("ℹ️ **Insight :** La VaR glissante montre que le risque n'est pas constant dans le temps : les pertes extrêmes attendues se creusent lors des périodes de crise et l'écart entre VaR normale et historique s'élargit précisément dans ces périodes de stress.")
+
+# Backtesting : exceptions des VaR glissantes et tests de Kupiec / Christoffersen, titres et portefeuilles sectoriels
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def var_backtest(log_return, sectors, window):
+    return backtest_grid(backtest_targets(log_return, sectors), windows=(window,), max_workers=1)
+
+st.subheader(f"Backtesting des VaR glissantes ({var_window} jours)")
+st.caption("Chaque séance est comparée à la VaR prévue la veille : VaR glissantes normale et historique (même calcul "
+           "que ci-dessus, fenêtre complète exigée) et VaR EWMA, appliquées à la série de la cible. Pour un secteur, la "
+           "cible est le portefeuille équipondéré (moyenne des rendements disponibles du jour), et non la fenêtre poolée "
+           "des graphiques, qui empile les rendements de tous les titres : les niveaux de VaR diffèrent donc.")
+backtest = var_backtest(log_return, sectors, var_window).xs(var_window, level="Fenêtre")
+st.dataframe(backtest.loc[list(sectors), ["Observations", "Exceptions", "Taux d'exceptions", "Kupiec p", "Christoffersen p"]])
+with st.expander("Détail par titre"):
+    st.dataframe(backtest.drop(index=list(sectors), level="Cible"))
+st.markdown("ℹ️ **Insight :** Une VaR bien calibrée à 99 % est dépassée environ une séance sur cent. Une p-value de Kupiec inférieure à 5 % rejette le taux d'exceptions observé ; une p-value de Christoffersen inférieure à 5 % signale des exceptions groupées dans le temps, que les modèles à volatilité constante ne captent pas.")
+
 # ─────────────────────────────────────────────
 # Intervalle de confiance
 # ─────────────────────────────────────────────
 st.header("4. Intervalle de confiance sur la moyenne")
+sections.start("4. Intervalles de confiance", rows=len(log_return))
 
-def get_confidence_interval(mean, std, n, alpha=0.05):
-    z = norm.ppf(1 - alpha/2)
-    margin_error = z * (std / np.sqrt(n))
-    return mean - margin_error, mean + margin_error, margin_error
-
-ic_gafam = get_confidence_interval(gafam_stat["Mean"].values[0], gafam_stat["Std"].values[0], Gafam_sector.shape[0])
-ic_utilities = get_confidence_interval(utilities_stat["Mean"].values[0], utilities_stat["Std"].values[0], Utilities_sector.shape[0])
-
-st.write(f"Intervalle de confiance GAFAM (95%) : [{ic_gafam[0]:.6f} ; {ic_gafam[1]:.6f}]")
-st.write(f"Intervalle de confiance Utilities (95%) : [{ic_utilities[0]:.6f} ; {ic_utilities[1]:.6f}]")
+# IC à 95 % sur la moyenne, calculés avec les statistiques sectorielles (colonnes "IC bas" / "IC haut")
+for sector_name, sector in all_sector_stats.iterrows():
+    st.write(f"Intervalle de confiance {sector_name} (95%) : [{sector['IC bas']:.6f} ; {sector['IC haut']:.6f}]")
 st.markdown("ℹ️ **Insight :** Malgré leur volatilité individuelle, les GAFAM présentent un intervalle de confiance plus resserré. Cela indique que, collectivement, leur moyenne de rendement est estimée avec une incertitude plus faible que celle des Utilities et traduit une meilleure stabilité moyenne dans la performance agrégée.")
+
+# Intervalles bootstrap : rééchantillonnage des séances par lots vectorisés
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def sector_bootstrap(log_return, sector_tickers, method):
+    return bootstrap_confidence_intervals(log_return, sector_tickers, method=method)
+
+st.subheader("Intervalles bootstrap (95 %, 10 000 rééchantillonnages)")
+boot_method = st.radio("Méthode", ["iid", "block"], horizontal=True,
+                       format_func=lambda m: "Séances indépendantes" if m == "iid" else "Blocs de 20 séances")
+for column, (sector_name, sector_tickers) in zip(st.columns(len(sectors)), sectors.items()):
+    with column:
+        st.markdown(f"**{sector_name}**")
+        st.dataframe(sector_bootstrap(log_return, sector_tickers, boot_method))
+st.markdown("ℹ️ **Insight :** Le bootstrap ne suppose pas la normalité des rendements : il fournit aussi des intervalles sur la volatilité, la skewness et les VaR. L'intervalle sur la skewness est large, signe que l'asymétrie des rendements est mesurée avec beaucoup d'incertitude, d'autant plus que les queues de distribution sont épaisses.")
 # ─────────────────────────────────────────────
 # Histogrammes et distributions
 # ─────────────────────────────────────────────
 st.header("5. Visualisation des distributions")
+sections.start("5. Visualisation des distributions")
 
-fig, ax = plt.subplots(2, 2, figsize=(12, 8))
-
-dens_gafam = np.arange(Gafam_sector.min() - 0.001, Gafam_sector.max() + 0.001, 0.001)
-dens_util = np.arange(Utilities_sector.min() - 0.001, Utilities_sector.max() + 0.001, 0.001)
-
-# Histogrammes + PDF
-ax[0, 0].hist(Gafam_sector, bins=100, density=True, color='skyblue', alpha=0.6, label="Rendements GAFAM")
-ax[0, 0].plot(dens_gafam, norm.pdf(dens_gafam, gafam_stat["Mean"], gafam_stat["Std"]), color="blue", label="PDF Normale")
-ax[0, 0].set_title("Histogramme GAFAM")
-ax[0, 0].set_xlabel("Rendement Logarithmique")
-ax[0, 0].set_ylabel("Densité")
-ax[0, 0].legend()
-
-ax[0, 1].hist(Utilities_sector, bins=100, density=True, color='skyblue', alpha=0.6, label="Rendements Utilities")
-ax[0, 1].plot(dens_util, norm.pdf(dens_util, utilities_stat["Mean"], utilities_stat["Std"]), color="green", label="PDF Normale")
-ax[0, 1].set_title("Histogramme Utilities")
-ax[0, 1].set_xlabel("Rendement Logarithmique")
-ax[0, 1].set_ylabel("Densité")
-ax[0, 1].legend()
-
-# CDF + VaR normale + VaR empirique
-ax[1, 0].plot(dens_gafam, norm.cdf(dens_gafam, gafam_stat["Mean"], gafam_stat["Std"]), color="blue", label="CDF GAFAM")
-ax[1, 0].axvline(gafam_stat["VaR à 95%"].values[0], color="orange", linestyle="--", label="VaR Normale 95%")
-ax[1, 0].axvline(gafam_stat["VaR à 99%"].values[0], color="red", linestyle="--", label="VaR Normale 99%")
-ax[1, 0].axvline(gafam_VaR_95_emp, color="orange", linestyle="-.", label="VaR Empirique 95%")
-ax[1, 0].axvline(gafam_VaR_99_emp, color="red", linestyle="-.", label="VaR Empirique 99%")
-ax[1, 0].set_title("CDF GAFAM avec VaR")
-ax[1, 0].set_xlabel("Rendement Logarithmique")
-ax[1, 0].set_ylabel("Probabilité cumulée")
-ax[1, 0].legend()
-
-ax[1, 1].plot(dens_util, norm.cdf(dens_util, utilities_stat["Mean"], utilities_stat["Std"]), color="green", label="CDF Utilities")
-ax[1, 1].axvline(utilities_stat["VaR à 95%"].values[0], color="orange", linestyle="--", label="VaR Normale 95%")
-ax[1, 1].axvline(utilities_stat["VaR à 99%"].values[0], color="red", linestyle="--", label="VaR Normale 99%")
-ax[1, 1].axvline(utilities_VaR_95_emp, color="orange", linestyle="-.", label="VaR Empirique 95%")
-ax[1, 1].axvline(utilities_VaR_99_emp, color="red", linestyle="-.", label="VaR Empirique 99%")
-ax[1, 1].set_title("CDF Utilities avec VaR")
-ax[1, 1].set_xlabel("Rendement Logarithmique")
-ax[1, 1].set_ylabel("Probabilité cumulée")
-ax[1, 1].legend()
-
-plt.tight_layout()
-st.pyplot(fig)
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def render_distribution_figure(stats, _sketches):
+    # Rendu partagé avec le script et le mode batch (figures.py), une seule fois par tableau de statistiques
+    # puis servi en PNG depuis le cache ; les sketches, dont dérive ce tableau, ne sont pas hachés
+    return figure_png(distribution_figure(stats, _sketches))
+
+st.image(render_distribution_figure(all_sector_stats, sketches), use_container_width=True)
+sections.stop()
 
 st.markdown("ℹ️ **Insight :** Les histogrammes et courbes de densité confirment les résultats précédents : les Utilities présentent une distribution plus concentrée autour de leur moyenne, tandis que les GAFAM montrent une queue gauche plus longue confirmant leur plus grande probabilité de pertes extrêmes.")
 # ─────────────────────────────────────────────
@@ -213,3 +268,19 @@ Cette étude illustre la complexité du risque. Le secteur technologique ne peut
 **Conclusion :**
 Les investisseurs doivent arbitrer selon leur tolérance au risque, leurs objectifs de rendement, et leur horizon temporel. Ici, chaque secteur a son intérêt : explosivité mesurée (GAFAM) vs stabilité rassurante (Utilities).
 """)
+
+# ─────────────────────────────────────────────
+# Diagnostics (optionnel)
+# ─────────────────────────────────────────────
+if recorder is not None:
+    recorder.close()
+    st.session_state.pop("recorder", None)
+    if diagnostics:
+        st.sidebar.subheader("Diagnostics")
+        st.sidebar.caption("Dernière exécution : une étape en cache n'apparaît pas dans le détail des calculs.")
+        timings = recorder.to_frame()
+        columns = ["span", "wall_s", "cpu_s", "rows"]
+        if recorder.memory:
+            timings["peak_MiB"] = pd.to_numeric(timings["peak_bytes"]) / 2**20
+            columns.insert(3, "peak_MiB")
+        st.sidebar.dataframe(timings[columns], hide_index=True)
@@ -0,0 +1,170 @@
+# ─────────────────────────────────────────────
+# Mise à jour incrémentale : nouvelles séances ajoutées sans recalculer l'historique
+# ─────────────────────────────────────────────
+# RiskState conserve, pour chaque titre :
+# - n, la moyenne et les sommes des écarts centrés Σd², Σd³, Σd⁴ (moments.central_moments),
+#   combinées lot par lot (moments.combine_central, forme par lots de Welford) ;
+# - un ReturnsSketch (t-digest + histogramme, sketches.py) pour la VaR historique ;
+# - le dernier cours de clôture, pour le rendement de la séance suivante.
+# update() coûte O(nouvelles séances) ; les tables par titre et par secteur (moments
+# poolés, N de l'intervalle de confiance, VaR normale et historique) se déduisent
+# de l'état sans relire les rendements. save()/load() écrivent l'état sur disque
+# pour qu'un service redémarré reprenne là où il s'était arrêté.
+#
+#   python incremental.py --state risk_state.npz --start 2000-05-31   # crée ou complète l'état
+#   python incremental.py --state risk_state.npz                      # reprend à la dernière séance
+import argparse
+import json
+import os
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+from analytics import risk_columns
+from moments import STAT_COLUMNS, central_moments, combine_central, moments_from_central
+from parameters import LEVELS
+from price_store import DEFAULT_STORE_DIR, PriceStore
+from sketches import FixedHistogram, ReturnsSketch, TDigest
+from universe import DEFAULT_SECTORS, load_sector_map, universe_tickers
+
+
+class RiskState:
+    def __init__(self, sectors=DEFAULT_SECTORS):
+        self.sectors = {name: list(tickers) for name, tickers in sectors.items()}
+        self.tickers = universe_tickers(sectors)
+        self.central = np.zeros((5, len(self.tickers)))
+        self.sketches = {t: ReturnsSketch() for t in self.tickers}
+        self.last_close = pd.Series(np.nan, index=self.tickers)
+        self.last_date = None
+
+    @classmethod
+    def from_prices(cls, close, sectors=DEFAULT_SECTORS):
+        state = cls(sectors)
+        state.update(close)
+        return state
+
+    def update(self, close):
+        """Ajoute les séances de `close` (cours alignés, une colonne par ticker) postérieures à la dernière séance.
+
+        Les rendements sont ceux de np.log(close / close.shift(1)) sur l'historique complet :
+        la première nouvelle séance est rapportée au dernier cours conservé. Renvoie le
+        nombre de séances de rendements ajoutées.
+        """
+        close = close.reindex(columns=self.tickers).sort_index()
+        if self.last_date is not None:
+            close = close[close.index > self.last_date]
+        if close.empty:
+            return 0
+        prices = close if self.last_date is None else pd.concat([self.last_close.to_frame(self.last_date).T, close])
+        log_return = np.log(prices / prices.shift(1)).iloc[1:].dropna(how="all")
+        values = log_return.to_numpy(dtype="float64")
+        self.central = combine_central(self.central, central_moments(values))
+        for j, ticker in enumerate(self.tickers):
+            self.sketches[ticker].add(values[:, j])
+        self.last_close = close.iloc[-1]
+        self.last_date = close.index[-1]
+        return len(log_return)
+
+    def refresh(self, store=None, start=None, end=None):
+        """Complète l'état depuis le stock de cours jusqu'à `end` exclu (défaut : aujourd'hui, séance en cours exclue)."""
+        if self.last_date is None and start is None:
+            raise ValueError("État vide : une date de début est nécessaire")
+        start = start if self.last_date is None else self.last_date + pd.Timedelta(days=1)
+        end = pd.Timestamp.today().normalize() if end is None else pd.Timestamp(end)
+        if pd.Timestamp(start) >= end:
+            return 0
+        return self.update((store or PriceStore()).get_many(self.tickers, start, end))
+
+    # ── Tables ──
+    def ticker_table(self, tickers=None):
+        """Statistiques par titre (Mean, Std, Skewness, Kurtosis), comme moments.ticker_moments."""
+        tickers = list(self.tickers if tickers is None else tickers)
+        positions = [self.tickers.index(t) for t in tickers]
+        mean, std, skewness, kurt, _ = moments_from_central(self.central[:, positions])
+        return pd.DataFrame(dict(zip(STAT_COLUMNS, (mean, std, skewness, kurt))), index=tickers)
+
+    def sector_table(self, levels=LEVELS, alpha=0.05):
+        """(statistiques, sketches) de chaque secteur, comme analytics.sector_table."""
+        pooled = np.stack([reduce(combine_central, (self.central[:, self.tickers.index(t)] for t in tickers))
+                           for tickers in self.sectors.values()], axis=1)
+        mean, std, skewness, kurt, n = moments_from_central(pooled)
+        stats = pd.DataFrame(dict(zip(STAT_COLUMNS, (mean, std, skewness, kurt))), index=list(self.sectors))
+        stats["N"] = n.astype("int64")
+        sketches = {name: ReturnsSketch.merge([self.sketches[t] for t in tickers]) for name, tickers in self.sectors.items()}
+        return risk_columns(stats, sketches, levels, alpha), sketches
+
+    # ── Sauvegarde / reprise ──
+    def save(self, path):
+        """Écrit l'état dans un fichier .npz (écriture atomique)."""
+        digests = [self.sketches[t].digest for t in self.tickers]
+        histogram = self.sketches[self.tickers[0]].histogram
+        meta = {"sectors": self.sectors, "tickers": self.tickers,
+                "last_date": None if self.last_date is None else self.last_date.strftime("%Y-%m-%d"),
+                "compression": digests[0].compression,
+                "histogram": [histogram.lo, histogram.hi, histogram.width]}
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, meta=json.dumps(meta), central=self.central, last_close=self.last_close.to_numpy(),
+                 digest_sizes=[len(d.means) for d in digests],
+                 digest_means=np.concatenate([d.means for d in digests]),
+                 digest_weights=np.concatenate([d.weights for d in digests]),
+                 digest_extremes=np.array([[d.min, d.max] for d in digests]),
+                 histogram_counts=np.stack([self.sketches[t].histogram.counts for t in self.tickers]))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            state = cls(meta["sectors"])
+            state.tickers = meta["tickers"]
+            state.central = data["central"]
+            state.last_close = pd.Series(data["last_close"], index=state.tickers)
+            state.last_date = None if meta["last_date"] is None else pd.Timestamp(meta["last_date"])
+            bounds = np.r_[0, np.cumsum(data["digest_sizes"])]
+            for j, ticker in enumerate(state.tickers):
+                digest = TDigest(meta["compression"])
+                digest.means = data["digest_means"][bounds[j]:bounds[j + 1]]
+                digest.weights = data["digest_weights"][bounds[j]:bounds[j + 1]]
+                digest.min, digest.max = data["digest_extremes"][j]
+                histogram = FixedHistogram(*meta["histogram"])
+                histogram.counts = data["histogram_counts"][j]
+                state.sketches[ticker] = ReturnsSketch(digest, histogram)
+        return state
+
+
+def _normalized(sectors):
+    return {name: list(tickers) for name, tickers in sectors.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mise à jour incrémentale des statistiques, VaR et IC par titre et secteur.")
+    parser.add_argument("--state", default="risk_state.npz", help="Fichier d'état (créé s'il n'existe pas)")
+    parser.add_argument("--start", help="Date de début (YYYY-MM-DD), nécessaire à la création de l'état")
+    parser.add_argument("--end", help="Date de fin exclue (défaut : aujourd'hui)")
+    parser.add_argument("--sectors", help="Correspondance secteurs (JSON/CSV), à la création de l'état (doit être identique ensuite)")
+    parser.add_argument("--store", default=DEFAULT_STORE_DIR, help="Répertoire du stock local des cours")
+    args = parser.parse_args(argv)
+
+    if os.path.exists(args.state):
+        state = RiskState.load(args.state)
+        if args.sectors and _normalized(load_sector_map(args.sectors)) != _normalized(state.sectors):
+            parser.error(f"--sectors diffère de la correspondance enregistrée dans {args.state} ; "
+                         "supprimer le fichier d'état pour repartir avec la nouvelle correspondance")
+    else:
+        state = RiskState(load_sector_map(args.sectors))
+    added = state.refresh(PriceStore(args.store), args.start, args.end)
+    state.save(args.state)
+
+    if state.last_date is None:
+        print("Aucune séance sur la période : état vide")
+        return state
+    print(f"{added} séance(s) ajoutée(s), dernière séance : {state.last_date:%Y-%m-%d}")
+    for name, tickers in state.sectors.items():
+        print(f"\n{name}\n{state.ticker_table(tickers)}")
+    print(f"\n{state.sector_table()[0].T}")
+    return state
+
+
+if __name__ == "__main__":
+    main()
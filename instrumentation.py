@@ -0,0 +1,200 @@
+# ─────────────────────────────────────────────
+# Instrumentation des étapes : temps, CPU, mémoire et volumes traités
+# ─────────────────────────────────────────────
+# - span(nom)      : gestionnaire de contexte autour d'un bloc de code ;
+# - traced(nom)    : décorateur équivalent pour une fonction ;
+# - Sections       : enchaîne des spans successifs (sections numérotées d'un script
+#                    exécuté de haut en bas, sans réindenter le code).
+# Chaque span enregistre le temps écoulé, le temps CPU du processus, le pic
+# d'allocation (tracemalloc, sur option) et un nombre de lignes optionnel. Les
+# mesures sont rattachées à l'enregistreur actif (Recorder), propre au contexte
+# d'exécution (contextvars) : chaque session Streamlit a le sien. Sans
+# enregistreur actif, span() renvoie un objet inerte partagé : coût quasi nul.
+# La mesure mémoire est distincte du chronométrage (Recorder(memory=True)) :
+# tracemalloc ralentit toutes les allocations du processus (un facteur 3 à 4 sur
+# une exécution de l'application). Il est global au processus : un compteur
+# d'enregistreurs le démarre au premier et l'arrête au dernier, à la fermeture
+# (close(), bloc with) ou, à défaut, à la destruction de l'enregistreur. Les pics
+# mesurés en même temps par plusieurs sessions sont approximatifs ; le temps CPU
+# est celui du processus.
+#
+# Activation pour les scripts : variable d'environnement RISK_PROFILE=<fichier.jsonl>
+# (une mesure JSON par ligne, ajoutée à la fin du fichier), et RISK_PROFILE_MEMORY=1
+# pour mesurer aussi les pics d'allocation.
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+import weakref
+from datetime import datetime
+
+_recorder = contextvars.ContextVar("risk_recorder", default=None)
+
+# Enregistreurs mesurant la mémoire ; tracemalloc n'est arrêté que s'il a été démarré ici
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_started = False
+
+
+def _acquire_tracing():
+    global _tracing_users, _tracing_started
+    with _tracing_lock:
+        if _tracing_users == 0:
+            _tracing_started = not tracemalloc.is_tracing()
+            if _tracing_started:
+                tracemalloc.start()
+        _tracing_users += 1
+
+
+def _release_tracing():
+    global _tracing_users, _tracing_started
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_started:
+            tracemalloc.stop()
+            _tracing_started = False
+
+
+class Recorder:
+    def __init__(self, path=None, memory=False):
+        self.path = path
+        self.memory = memory
+        self.records = []
+        self._stack = []
+        # Libération appelée une seule fois : par close() ou, à défaut, quand l'enregistreur est détruit
+        self._release = None
+        if memory:
+            _acquire_tracing()
+            self._release = weakref.finalize(self, _release_tracing)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def emit(self, record):
+        self.records.append(record)
+        if self.path:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def close(self):
+        if self._release is not None:
+            self._release()
+
+    def to_frame(self):
+        import pandas as pd
+        return pd.DataFrame(self.records)
+
+
+def set_recorder(recorder):
+    """Active `recorder` (ou désactive l'instrumentation avec None) pour le contexte courant."""
+    _recorder.set(recorder)
+    return recorder
+
+
+def recorder_from_env(var="RISK_PROFILE", memory_var="RISK_PROFILE_MEMORY"):
+    path = os.environ.get(var)
+    memory = os.environ.get(memory_var, "") not in ("", "0")
+    return set_recorder(Recorder(path, memory=memory)) if path else None
+
+
+class Span:
+    def __init__(self, recorder, name, rows=None):
+        self.recorder = recorder
+        self.name = name
+        self.rows = rows
+        self._peak_seen = 0
+        self._start_memory = None
+
+    def __enter__(self):
+        stack = self.recorder._stack
+        self.path = "/".join([s.name for s in stack] + [self.name])
+        if self.recorder.memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            # Le pic atteint jusqu'ici appartient au span parent ; on repart de zéro pour celui-ci
+            if stack:
+                stack[-1]._peak_seen = max(stack[-1]._peak_seen, peak)
+            tracemalloc.reset_peak()
+            self._start_memory = current
+        stack.append(self)
+        self._started_at = datetime.now().isoformat(timespec="milliseconds")
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        stack = self.recorder._stack
+        stack.pop()
+        peak = None
+        if self._start_memory is not None and tracemalloc.is_tracing():
+            peak = max(self._peak_seen, tracemalloc.get_traced_memory()[1])
+            if stack:
+                stack[-1]._peak_seen = max(stack[-1]._peak_seen, peak)
+            peak = max(0, peak - self._start_memory)
+        self.recorder.emit({"span": self.path, "start": self._started_at, "wall_s": round(wall, 6),
+                            "cpu_s": round(cpu, 6), "peak_bytes": peak, "rows": self.rows})
+        return False
+
+
+class _NullSpan:
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name, rows=None):
+    recorder = _recorder.get()
+    if recorder is None:
+        return _NULL_SPAN
+    return Span(recorder, name, rows)
+
+
+def traced(name=None):
+    def decorate(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _recorder.get() is None:
+                return func(*args, **kwargs)
+            with span(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class Sections:
+    """Spans successifs : start() ferme la section en cours et ouvre la suivante."""
+
+    def __init__(self):
+        self.current = None
+
+    def start(self, name, rows=None):
+        self.stop()
+        self.current = span(name, rows).__enter__()
+        return self.current
+
+    def stop(self, rows=None):
+        if self.current is not None:
+            if rows is not None:
+                self.current.rows = rows
+            self.current.__exit__(None, None, None)
+            self.current = None
@@ -0,0 +1,127 @@
+# ─────────────────────────────────────────────
+# Moments statistiques en une passe : par titre et par secteur
+# ─────────────────────────────────────────────
+# Pour chaque colonne, n, la moyenne et les sommes des écarts centrés (Σd², Σd³, Σd⁴)
+# sont calculées une seule fois. Moyenne, écart-type, skewness et kurtosis (excès)
+# s'en déduisent, avec les mêmes corrections de biais que pandas (.std(), .skew(),
+# .kurtosis()). Les statistiques sectorielles "poolées" s'obtiennent en combinant
+# les moments centrés des tickers du secteur (formules de Chan et Pébay), sans
+# empiler (.stack()) les rendements ; incremental.py les combine de même lot par lot.
+# Les sommes de puissances brutes (Σx, Σx², …) perdent toute précision quand la
+# moyenne est grande devant la dispersion : elles ne servent que décalées d'une
+# valeur proche de la moyenne (power_sums(values, shift), utilisé par le bootstrap
+# dont les sommes d'un rééchantillonnage sont un produit matriciel).
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import traced
+
+STAT_COLUMNS = ["Mean", "Std", "Skewness", "Kurtosis"]
+
+
+def power_sums(values, shift=0.0):
+    """Tableau (5, k) : n, Σx, Σx², Σx³, Σx⁴ par colonne, avec x = valeur − shift, valeurs manquantes (NaN) ignorées."""
+    values = np.asarray(values, dtype="float64")
+    if values.ndim == 1:
+        values = values[:, None]
+    valid = ~np.isnan(values)
+    x = np.where(valid, values - shift, 0.0)
+    x2 = x * x
+    return np.stack([valid.sum(axis=0), x.sum(axis=0), x2.sum(axis=0),
+                     (x2 * x).sum(axis=0), (x2 * x2).sum(axis=0)]).astype("float64")
+
+
+def moments_from_sums(sums, shift=0.0):
+    """Moyenne, écart-type (ddof=1), skewness et kurtosis d'excès corrigés du biais, comme pandas.
+
+    sums : sommes de puissances des valeurs décalées de `shift` (power_sums) ; le
+    résultat n'est précis que si shift est proche de la moyenne.
+    """
+    n, s1, s2, s3, s4 = np.asarray(sums, dtype="float64")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = s1 / n
+        # Sommes des écarts centrés à la moyenne
+        m2 = s2 - n * mean**2
+        m3 = s3 - 3 * mean * s2 + 2 * n * mean**3
+        m4 = s4 - 4 * mean * s3 + 6 * mean**2 * s2 - 3 * n * mean**4
+    return moments_from_central(np.stack([n, mean + shift, m2, m3, m4]))
+
+
+def central_moments(values):
+    """Tableau (5, k) : n, moyenne et sommes des écarts centrés Σd², Σd³, Σd⁴ par colonne (NaN ignorés)."""
+    values = np.asarray(values, dtype="float64")
+    if values.ndim == 1:
+        values = values[:, None]
+    valid = ~np.isnan(values)
+    n = valid.sum(axis=0).astype("float64")
+    mean = np.where(valid, values, 0.0).sum(axis=0) / np.maximum(n, 1)
+    d = np.where(valid, values - mean, 0.0)
+    d2 = d * d
+    return np.stack([n, mean, d2.sum(axis=0), (d2 * d).sum(axis=0), (d2 * d2).sum(axis=0)])
+
+
+def combine_central(a, b):
+    """Moments centrés de la réunion de deux échantillons (formules de Chan et Pébay), sans relire les données."""
+    n_a, mean_a, m2_a, m3_a, m4_a = a
+    n_b, mean_b, m2_b, m3_b, m4_b = b
+    n = n_a + n_b
+    safe_n = np.maximum(n, 1)
+    delta = mean_b - mean_a
+    mean = mean_a + delta * n_b / safe_n
+    m2 = m2_a + m2_b + delta**2 * n_a * n_b / safe_n
+    m3 = (m3_a + m3_b + delta**3 * n_a * n_b * (n_a - n_b) / safe_n**2
+          + 3 * delta * (n_a * m2_b - n_b * m2_a) / safe_n)
+    m4 = (m4_a + m4_b + delta**4 * n_a * n_b * (n_a**2 - n_a * n_b + n_b**2) / safe_n**3
+          + 6 * delta**2 * (n_a**2 * m2_b + n_b**2 * m2_a) / safe_n**2
+          + 4 * delta * (n_a * m3_b - n_b * m3_a) / safe_n)
+    return np.stack([n, mean, m2, m3, m4])
+
+
+def moments_from_central(central):
+    """Statistiques (comme moments_from_sums) à partir de n, moyenne et sommes des écarts centrés."""
+    n, mean, m2, m3, m4 = np.asarray(central, dtype="float64")
+    # Comme pandas, les sommes en deçà de l'erreur d'arrondi comptent pour zéro (série constante → skewness et
+    # kurtosis nulles), avec la même tolérance relative (eps·max|x|)^p·n ; max|x| n'étant pas conservé par les
+    # moments centrés, il est majoré par |moyenne| + √Σd²
+    scale = np.finfo("float64").eps * (np.abs(mean) + np.sqrt(np.maximum(m2, 0.0)))
+    m2, m3, m4 = (np.where(np.abs(m) < scale**p * n, 0.0, m) for m, p in ((m2, 2), (m3, 3), (m4, 4)))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(n > 0, mean, np.nan)
+        std = np.sqrt(m2 / (n - 1))
+        skewness = np.where(m2 > 0, np.sqrt(n * (n - 1)) / (n - 2) * (m3 / n) / (m2 / n) ** 1.5, 0.0)
+        kurt = np.where(m2 > 0, (n * (n + 1) * (n - 1) * m4) / ((n - 2) * (n - 3) * m2**2)
+                        - 3 * (n - 1) ** 2 / ((n - 2) * (n - 3)), 0.0)
+    std = np.where(n > 1, std, np.nan)
+    skewness = np.where(n > 2, skewness, np.nan)
+    kurt = np.where(n > 3, kurt, np.nan)
+    return mean, std, skewness, kurt, n
+
+
+def _ticker_central(log_return, tickers):
+    # Une ReturnsMatrix (universe.py) calcule elle-même ses moments, par blocs de lignes
+    if hasattr(log_return, "central_moments"):
+        return log_return.central_moments(tickers)
+    return central_moments(log_return[list(tickers)].to_numpy())
+
+
+@traced("moments.ticker_moments")
+def ticker_moments(log_return, tickers=None):
+    """Statistiques par titre (Mean, Std, Skewness, Kurtosis) en une passe sur les colonnes demandées."""
+    tickers = list(log_return.columns if tickers is None else tickers)
+    mean, std, skewness, kurt, _ = moments_from_central(_ticker_central(log_return, tickers))
+    return pd.DataFrame(dict(zip(STAT_COLUMNS, (mean, std, skewness, kurt))), index=tickers)
+
+
+@traced("moments.sector_moments")
+def sector_moments(log_return, sectors):
+    """Statistiques poolées par secteur ({nom: tickers}), déduites des moments des tickers, plus l'effectif N."""
+    tickers = list(dict.fromkeys(t for sector_tickers in sectors.values() for t in sector_tickers))
+    central = dict(zip(tickers, _ticker_central(log_return, tickers).T))
+    pooled = np.stack([reduce(combine_central, (central[t] for t in sector_tickers))
+                       for sector_tickers in sectors.values()], axis=1)
+    mean, std, skewness, kurt, n = moments_from_central(pooled)
+    stats = pd.DataFrame(dict(zip(STAT_COLUMNS, (mean, std, skewness, kurt))), index=list(sectors))
+    stats["N"] = n.astype("int64")
+    return stats
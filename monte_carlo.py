@@ -0,0 +1,116 @@
+# ─────────────────────────────────────────────
+# VaR et Expected Shortfall par simulation Monte Carlo
+# ─────────────────────────────────────────────
+# La grandeur simulée est le rendement journalier du portefeuille équipondéré
+# d'un secteur (moyenne des rendements disponibles des titres du secteur).
+# Trois modèles :
+# - "normal"    : loi normale ajustée sur la moyenne et l'écart-type observés ;
+# - "student"   : loi de Student dont les degrés de liberté reproduisent la
+#                 kurtosis d'excès observée (ν = 4 + 6 / kurtosis) ;
+# - "bootstrap" : bootstrap filtré (FHS) des lignes de log_return : les rendements
+#                 sont standardisés par une volatilité EWMA par titre, des séances
+#                 entières sont tirées (la dépendance entre titres est conservée)
+#                 puis remises à l'échelle de la volatilité courante.
+# Les scénarios sont générés par blocs de taille fixe, répartis sur un pool de
+# processus. Chaque bloc ne renvoie que sa queue gauche (ex aequo compris) : la matrice
+# complète des scénarios n'est jamais allouée, et VaR et ES sont exactes. Les graines
+# des blocs dérivent d'une SeedSequence : le résultat ne dépend pas du nombre de
+# processus (il dépend en revanche de chunk_size, qui fixe le découpage des graines).
+import math
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import traced
+from parallel import run_tasks, worker_data
+from parameters import EWMA_LAMBDA, LEVELS
+
+MODELS = ("normal", "student", "bootstrap")
+
+
+def fit_model(log_return, sector_tickers, model, ewma_lambda=EWMA_LAMBDA):
+    """Paramètres du modèle (dictionnaire picklable) pour le portefeuille équipondéré du secteur."""
+    returns = log_return[list(sector_tickers)].dropna(how="all")
+    portfolio = returns.mean(axis=1)
+    if model == "normal":
+        return {"model": model, "mean": portfolio.mean(), "std": portfolio.std()}
+    if model == "student":
+        kurt = portfolio.kurtosis()
+        # Au-delà de ~1e6 degrés de liberté la loi de Student est indiscernable de la normale
+        df = 4 + 6 / kurt if kurt > 0 else 1e6
+        scale = portfolio.std() * math.sqrt((df - 2) / df)
+        return {"model": model, "mean": portfolio.mean(), "scale": scale, "df": df}
+    if model == "bootstrap":
+        values = returns.to_numpy(dtype="float64")
+        # Volatilité EWMA conditionnelle (information de la veille), initialisée sur la variance de l'échantillon
+        var = np.nanvar(values, axis=0)
+        sigma = np.empty_like(values)
+        for t, row in enumerate(values):
+            sigma[t] = np.sqrt(var)
+            var = np.where(np.isnan(row), var, ewma_lambda * var + (1 - ewma_lambda) * row**2)
+        return {"model": model, "residuals": values / sigma, "sigma": np.sqrt(var)}
+    raise ValueError(f"Modèle Monte Carlo inconnu : {model!r} (attendu : {', '.join(MODELS)})")
+
+
+def _simulate(params, size, rng):
+    model = params["model"]
+    if model == "normal":
+        return rng.normal(params["mean"], params["std"], size)
+    if model == "student":
+        return params["mean"] + params["scale"] * rng.standard_t(params["df"], size)
+    rows = params["residuals"][rng.integers(0, len(params["residuals"]), size)] * params["sigma"]
+    return np.nanmean(rows, axis=1)
+
+
+def _chunk_tail(args):
+    size, seed, keep = args
+    scenarios = _simulate(worker_data(), size, np.random.default_rng(seed))
+    return _left_tail(scenarios, keep)
+
+
+def _left_tail(values, keep):
+    # Les `keep` plus petites valeurs et leurs ex aequo (fréquents avec le bootstrap) : toutes les valeurs
+    # inférieures ou égales à la VaR sont conservées, l'Expected Shortfall reste exact
+    kth = np.partition(values, min(keep, len(values)) - 1)[min(keep, len(values)) - 1]
+    return values[values <= kth]
+
+
+def _merge_tails(tails, keep):
+    tail = np.empty(0)
+    for chunk in tails:
+        tail = _left_tail(np.concatenate([tail, chunk]), keep)
+    return np.sort(tail)
+
+
+def monte_carlo_var(log_return, sector_tickers, model="normal", n_scenarios=1_000_000,
+                    levels=LEVELS, chunk_size=500_000, seed=0, max_workers=None):
+    """VaR et Expected Shortfall (en rendement, valeurs négatives) du secteur pour chaque niveau."""
+    if n_scenarios < 2:
+        raise ValueError(f"Au moins 2 scénarios sont nécessaires (n_scenarios = {n_scenarios})")
+    params = fit_model(log_return, sector_tickers, model)
+    n_chunks = math.ceil(n_scenarios / chunk_size)
+    sizes = [chunk_size] * (n_chunks - 1) + [n_scenarios - chunk_size * (n_chunks - 1)]
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    # Le quantile q global est parmi les `keep` plus petites valeurs : chaque bloc ne renvoie que celles-ci
+    keep = int(max(1 - level for level in levels) * (n_scenarios - 1)) + 2
+    tasks = list(zip(sizes, seeds, [keep] * n_chunks))
+
+    tail = _merge_tails(run_tasks(_chunk_tail, tasks, params, max_workers), keep)
+
+    result = {}
+    for level in levels:
+        # Même interpolation linéaire que np.percentile sur l'échantillon complet
+        pos = (n_scenarios - 1) * (1 - level)
+        lo = int(pos)
+        var = tail[lo] + (tail[lo + 1] - tail[lo]) * (pos - lo)
+        result[f"VaR {level:.0%}"] = var
+        result[f"ES {level:.0%}"] = tail[tail <= var].mean()
+    return pd.Series(result, name=model)
+
+
+@traced("monte_carlo.monte_carlo_table")
+def monte_carlo_table(log_return, sectors, models=MODELS, **kwargs):
+    """VaR / ES Monte Carlo pour chaque secteur ({nom: tickers}) et chaque modèle."""
+    rows = {(name, model): monte_carlo_var(log_return, sector_tickers, model, **kwargs)
+            for name, sector_tickers in sectors.items() for model in models}
+    return pd.DataFrame(rows).T.rename_axis(["Secteur", "Modèle"])
@@ -0,0 +1,47 @@
+# ─────────────────────────────────────────────
+# Pool de processus commun (bootstrap, Monte Carlo, backtesting, mode batch)
+# ─────────────────────────────────────────────
+# Les tâches reçoivent de petits arguments (graines, tailles, fenêtres) ; les
+# données volumineuses sont transmises une seule fois à chaque processus par
+# l'initialiseur du pool et lues par les tâches avec worker_data(). Avec un seul
+# processus (max_workers=1 ou une seule tâche), les tâches s'exécutent dans le
+# processus courant, sans pool ni copie des données.
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+_worker_data = None
+
+
+def worker_data():
+    """Données partagées du processus courant (fixées par run_tasks ou set_worker_data)."""
+    return _worker_data
+
+
+def set_worker_data(data):
+    global _worker_data
+    _worker_data = data
+
+
+def _init_worker(load, data):
+    set_worker_data(data if load is None else load(data))
+
+
+def pool_size(max_workers, n_tasks):
+    """Nombre de processus utiles : max_workers (défaut : nombre de cœurs), au plus un par tâche."""
+    max_workers = os.cpu_count() if max_workers is None else max_workers
+    return max(1, min(max_workers, n_tasks))
+
+
+def run_tasks(func, tasks, data, max_workers=None, load=None):
+    """[func(tâche) for tâche in tasks], dans l'ordre, réparties sur un pool de processus.
+
+    Chaque processus reçoit data une fois (load(data) s'il est fourni, par exemple pour
+    relire une matrice en mémoire mappée) ; func la lit avec worker_data().
+    """
+    tasks = list(tasks)
+    workers = pool_size(max_workers, len(tasks))
+    if workers == 1:
+        _init_worker(load, data)
+        return list(map(func, tasks))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(load, data)) as pool:
+        return list(pool.map(func, tasks))
@@ -0,0 +1,11 @@
+# ─────────────────────────────────────────────
+# Paramètres communs des mesures de risque
+# ─────────────────────────────────────────────
+# Niveaux de VaR et facteur de lissage RiskMetrics utilisés par défaut par tous les
+# modules (statistiques sectorielles, sketches, VaR glissante, bootstrap, Monte
+# Carlo, portefeuille, backtesting) : une seule définition à modifier.
+
+# Niveaux de confiance des VaR (et des Expected Shortfall)
+LEVELS = (0.95, 0.99)
+# λ des variances et covariances EWMA (RiskMetrics, données journalières)
+EWMA_LAMBDA = 0.94
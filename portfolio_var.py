@@ -0,0 +1,176 @@
+# ─────────────────────────────────────────────
+# VaR paramétrique du portefeuille sectoriel : covariances statique et EWMA
+# ─────────────────────────────────────────────
+# Le secteur est traité comme un portefeuille (équipondéré ou pondéré par
+# l'utilisateur) et non comme un ensemble d'observations indépendantes : la
+# volatilité du portefeuille σ² = wᵀ Σ w tient compte des corrélations entre titres.
+# - Covariance statique : matrice de covariance de l'échantillon (paires complètes).
+# - Covariance EWMA (RiskMetrics) : Σ_t = λ Σ_{t-1} + (1 − λ) r_{t-1} r_{t-1}ᵀ,
+#   connue la veille de chaque séance t, initialisée sur la covariance de
+#   l'échantillon. Convention pour les cotations manquantes : un titre n'entre dans
+#   la récurrence qu'entre sa première et sa dernière cotation (introduction en
+#   bourse, radiation) ; entre les deux, une séance sans cotation compte comme un
+#   cours inchangé (rendement nul, comme des cours reportés), Σ décroît donc de λ
+#   comme les jours cotés. Avant la première et après la dernière cotation, ses
+#   coefficients restent figés.
+# La récurrence est résolue par blocs de séances, sans boucle Python sur les dates :
+# dans un bloc, Σ s'obtient par produits et sommes cumulés (cumprod / cumsum) des
+# mises à jour, puis σ²_t = w_tᵀ Σ_t w_t pour toutes les séances d'un coup (einsum).
+# Pour la seule volatilité du portefeuille, les Σ_t ne sont pas formées : l'ensemble
+# des titres en cours de cotation ne change qu'aux introductions et radiations, et sur
+# chaque bloc où il est constant la récurrence restreinte à ces titres se résout en
+# deux produits matriciels (voir _complete_block_variance), soit O(séances × k²)
+# opérations BLAS au lieu de matrices k × k par séance. Des cotations manquantes
+# éparses ne découpent donc pas les blocs. Seule la matrice de fin de bloc est
+# reportée au suivant ; la taille des blocs est bornée en mémoire (max_block_bytes).
+# Les poids d'une séance sont renormalisés sur les titres cotés ce jour-là (comme la
+# moyenne des rendements disponibles). VaR exprimées en rendement (valeurs négatives).
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import traced
+from parameters import EWMA_LAMBDA, LEVELS
+
+# λ^-MAX_BLOCK reste loin du débordement et de la perte de précision
+MAX_BLOCK = 256
+
+
+def sector_weights(sector_tickers, weights=None):
+    """Poids normalisés du portefeuille sectoriel : équipondéré, ou {ticker: poids} fourni par l'utilisateur."""
+    tickers = list(sector_tickers)
+    if weights is None:
+        w = np.ones(len(tickers))
+    else:
+        w = np.array([weights.get(t, 0.0) for t in tickers], dtype="float64")
+    if w.sum() <= 0:
+        raise ValueError("Poids du portefeuille nuls pour tous les titres du secteur")
+    return pd.Series(w / w.sum(), index=tickers)
+
+
+def _daily_weights(values, w):
+    # Poids renormalisés sur les titres disponibles à chaque séance (lignes sans titre : poids nuls)
+    w_t = np.where(np.isnan(values), 0.0, w)
+    total = w_t.sum(axis=1, keepdims=True)
+    return np.divide(w_t, total, out=np.zeros_like(w_t), where=total > 0)
+
+
+def _listed(valid):
+    # Séances comprises entre la première et la dernière cotation de chaque titre
+    return (np.cumsum(valid, axis=0) > 0) & (np.cumsum(valid[::-1], axis=0)[::-1] > 0)
+
+
+def _sample_covariance(returns):
+    # Covariance sur les paires de séances complètes (comme DataFrame.cov), en trois produits matriciels sur
+    # les rendements centrés et le masque de cotation ; 0 pour les paires de moins de deux séances communes
+    values = returns.to_numpy(dtype="float64")
+    valid = ~np.isnan(values)
+    if valid.all():
+        return np.atleast_2d(np.cov(values, rowvar=False)) if len(values) > 1 else np.zeros((values.shape[1],) * 2)
+    mask = valid.astype("float64")
+    counts = valid.sum(axis=0)
+    x = np.where(valid, values, 0.0)
+    x = np.where(valid, x - np.divide(x.sum(axis=0), counts, out=np.zeros(len(counts)), where=counts > 0), 0.0)
+    n = mask.T @ mask
+    sums = x.T @ mask  # sums[i, j] : somme des rendements de i sur les séances où j est coté
+    centered = x.T @ x - np.divide(sums * sums.T, n, out=np.zeros_like(n), where=n > 0)
+    return np.divide(centered, n - 1, out=np.zeros_like(n), where=n > 1)
+
+
+def ewma_blocks(values, ewma_lambda=EWMA_LAMBDA, init=None, max_block_bytes=64 * 2**20):
+    """Itère sur (début, Σ) : covariances EWMA (bloc × k × k) des séances début, début + 1, …
+
+    Σ[j] est la covariance connue la veille de la séance début + j.
+    """
+    values = np.asarray(values, dtype="float64")
+    n_days, k = values.shape
+    cov = np.zeros((k, k)) if init is None else np.array(init, dtype="float64")
+    block = int(max(1, min(MAX_BLOCK, max_block_bytes // (8 * 8 * k * k))))
+    valid = ~np.isnan(values)
+    listed = _listed(valid)
+    for start in range(0, n_days, block):
+        x = np.where(valid[start:start + block], values[start:start + block], 0.0)
+        # Mises à jour du bloc : Σ ← a ⊙ Σ + b, avec a = λ et b = (1 − λ) r rᵀ là où les deux titres sont en cours
+        # de cotation (rendement manquant : nul)
+        b = (1 - ewma_lambda) * np.einsum("ti,tj->tij", x, x)
+        if listed[start:start + block].all():
+            decay = ewma_lambda ** np.arange(1, len(x) + 1)[:, None, None]
+        else:
+            both = np.einsum("ti,tj->tij", listed[start:start + block], listed[start:start + block])
+            decay = np.cumprod(np.where(both, ewma_lambda, 1.0), axis=0)
+        # Σ_j = P_j ⊙ (Σ_0 + Σ_{i<j} b_i / P_{i+1}), où P_{i+1} = decay[i] est le produit des a jusqu'à i
+        cum = np.cumsum(b / decay, axis=0)
+        before = np.concatenate([np.ones((1,) + decay.shape[1:]), decay[:-1]])
+        sums = np.concatenate([np.zeros((1, k, k)), cum[:-1]])
+        yield start, before * (cov + sums)
+        cov = decay[-1] * (cov + cum[-1])
+
+
+def _complete_block_variance(cov, r, w, ewma_lambda):
+    """(w_tᵀ Σ_t w_t du bloc, Σ de fin de bloc) sans former les Σ_t (titres de r tous en cours de cotation).
+
+    σ²_j = λ^j w_jᵀ Σ_0 w_j + (1 − λ) Σ_{i<j} λ^{j-1-i} (w_j · r_i)² : deux produits matriciels par bloc.
+    """
+    n = len(r)
+    powers = ewma_lambda ** np.arange(n + 1)
+    lag = np.arange(n)[:, None] - np.arange(n)[None, :] - 1
+    decay = np.where(lag >= 0, powers[np.clip(lag, 0, n)], 0.0)
+    variance = powers[:n] * ((w @ cov) * w).sum(axis=1) + (1 - ewma_lambda) * (decay * (w @ r.T) ** 2).sum(axis=1)
+    cov = powers[n] * cov + (1 - ewma_lambda) * (r * powers[n - 1::-1, None]).T @ r
+    return variance, cov
+
+
+def ewma_covariance(log_return, tickers=None, ewma_lambda=EWMA_LAMBDA):
+    """Covariances EWMA de toutes les séances (séances × k × k) ; mémoire en séances × k², pour k modéré."""
+    returns = log_return if tickers is None else log_return[list(tickers)]
+    values = returns.to_numpy(dtype="float64")
+    return np.concatenate([cov for _, cov in ewma_blocks(values, ewma_lambda, _sample_covariance(returns))])
+
+
+def portfolio_var(log_return, sector_tickers, weights=None, levels=LEVELS):
+    """VaR normale du portefeuille sectoriel à partir de la covariance de l'échantillon (pondération fixe)."""
+    returns = log_return[list(sector_tickers)].dropna(how="all")
+    w = sector_weights(sector_tickers, weights).to_numpy()
+    mean = float(np.nan_to_num(returns.mean().to_numpy()) @ w)
+    std = float(np.sqrt(w @ _sample_covariance(returns) @ w))
+    result = {"Mean": mean, "Std": std}
+    for level in levels:
+        result[f"VaR normale {level:.0%}"] = mean + std * NormalDist().inv_cdf(1 - level)
+    return pd.Series(result)
+
+
+@traced("portfolio_var.portfolio_var_table")
+def portfolio_var_table(log_return, sectors, weights=None, levels=LEVELS):
+    """VaR de portefeuille (covariance de l'échantillon) de chaque secteur ({nom: tickers})."""
+    return pd.DataFrame({name: portfolio_var(log_return, tickers, weights, levels)
+                         for name, tickers in sectors.items()}).T
+
+
+@traced("portfolio_var.ewma_portfolio_var")
+def ewma_portfolio_var(log_return, sector_tickers, weights=None, ewma_lambda=EWMA_LAMBDA, levels=LEVELS,
+                       max_block_bytes=64 * 2**20):
+    """Volatilité EWMA du portefeuille sectoriel et VaR (moyenne nulle, RiskMetrics) pour chaque séance."""
+    returns = log_return[list(sector_tickers)].dropna(how="all")
+    values = returns.to_numpy(dtype="float64")
+    w_t = _daily_weights(values, sector_weights(sector_tickers, weights).to_numpy())
+    variance = np.empty(len(values))
+    cov = _sample_covariance(returns)
+    # Blocs de `block` séances au plus (matrices bloc × bloc et bloc × k du calcul bornées en mémoire),
+    # coupés aux introductions et radiations ; rendements manquants nuls (voir l'en-tête)
+    valid = ~np.isnan(values)
+    listed = _listed(valid)
+    values = np.where(valid, values, 0.0)
+    block = int(max(1, min(MAX_BLOCK, max_block_bytes // (8 * (MAX_BLOCK + values.shape[1])))))
+    changes = np.flatnonzero((listed[1:] != listed[:-1]).any(axis=1)) + 1
+    bounds = np.union1d(np.union1d(changes, np.arange(0, len(values), block)), [len(values)])
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        cols = np.flatnonzero(listed[start])
+        sub = np.ix_(cols, cols)
+        variance[start:stop], cov[sub] = _complete_block_variance(cov[sub], values[start:stop, cols],
+                                                                  w_t[start:stop, cols], ewma_lambda)
+    std = np.sqrt(np.maximum(variance, 0.0))
+    result = pd.DataFrame({"Volatilité EWMA": std}, index=returns.index)
+    for level in levels:
+        result[f"VaR EWMA {level:.0%}"] = std * NormalDist().inv_cdf(1 - level)
+    return result
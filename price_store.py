@@ -0,0 +1,118 @@
+# ─────────────────────────────────────────────
+# Stockage local des cours de clôture (un fichier Parquet par ticker)
+# ─────────────────────────────────────────────
+# Les plages de dates demandées sont servies depuis le disque ; seules les
+# dates manquantes en début ou en fin de plage sont téléchargées puis
+# ajoutées au stock. Le "fetcher" est interchangeable : toute fonction
+# fetcher(ticker, start, end) -> pd.Series (cours de clôture indexés par date,
+# fin exclue comme yf.download) convient, en particulier les sources de
+# data_sources.py, ce qui permet de travailler hors ligne.
+# La plage couverte par chaque ticker est enregistrée à côté de son fichier
+# (<ticker>.coverage.json). Lecture, téléchargement et écriture d'un ticker se font
+# sous un verrou partagé par tous les PriceStore du processus ouverts sur le même
+# répertoire (l'application en crée un par appel, une session Streamlit par thread) :
+# la couverture relue sous ce verrou ne décrit jamais des dates absentes du fichier.
+import json
+import os
+import threading
+
+import pandas as pd
+
+from data_sources import YFinanceSource, fetch_closes
+from instrumentation import traced
+
+DEFAULT_STORE_DIR = os.environ.get("PRICE_STORE_DIR", ".price_store")
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _ticker_lock(root, ticker):
+    # Un verrou par (répertoire, ticker) : les tickers d'un même stock restent servis en parallèle
+    key = (os.path.abspath(root), ticker)
+    with _locks_guard:
+        return _locks.setdefault(key, threading.Lock())
+
+
+class PriceStore:
+    def __init__(self, root=DEFAULT_STORE_DIR, fetcher=None):
+        self.root = root
+        self.fetcher = fetcher if fetcher is not None else YFinanceSource()
+        os.makedirs(self.root, exist_ok=True)
+
+    # ── Lecture / écriture sur disque ──
+    def _path(self, ticker):
+        return os.path.join(self.root, f"{ticker}.parquet")
+
+    def _coverage_path(self, ticker):
+        return os.path.join(self.root, f"{ticker}.coverage.json")
+
+    def coverage(self, ticker):
+        """[début, fin) déjà couvert par le stock pour `ticker` (dates "YYYY-MM-DD"), ou None."""
+        path = self._coverage_path(ticker)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_coverage(self, ticker, start, end):
+        tmp = self._coverage_path(ticker) + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump([start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")], f)
+        os.replace(tmp, self._coverage_path(ticker))
+
+    def load(self, ticker):
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            return pd.Series(dtype="float64", name=ticker, index=pd.DatetimeIndex([]))
+        return pd.read_parquet(path)["Close"].rename(ticker)
+
+    def _save(self, ticker, close):
+        tmp = self._path(ticker) + ".tmp"
+        close.rename("Close").to_frame().to_parquet(tmp)
+        os.replace(tmp, self._path(ticker))
+
+    # ── Complément incrémental ──
+    def _fetch(self, ticker, start, end):
+        close = self.fetcher(ticker, start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d"))
+        close = close.dropna().astype("float64")
+        close.index = pd.DatetimeIndex(close.index).tz_localize(None).normalize()
+        return close[(close.index >= start) & (close.index < end)]
+
+    def get(self, ticker, start, end):
+        """Cours de clôture de `ticker` sur [start, end), complétés depuis le fetcher si besoin."""
+        start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+        # La séance du jour n'est jamais considérée comme acquise : elle sera retéléchargée
+        known_end = min(end, pd.Timestamp.today().normalize())
+
+        with _ticker_lock(self.root, ticker):
+            covered = self.coverage(ticker)
+            close = self.load(ticker)
+            missing = []
+            if covered is None:
+                missing.append((start, end))
+            else:
+                cov_start, cov_end = pd.Timestamp(covered[0]), pd.Timestamp(covered[1])
+                if start < cov_start:
+                    missing.append((start, cov_start))
+                if end > cov_end:
+                    missing.append((cov_end, end))
+
+            if missing:
+                parts = [close] + [self._fetch(ticker, a, b) for a, b in missing if a < b]
+                parts = [p for p in parts if not p.empty]
+                if parts:
+                    close = pd.concat(parts)
+                    close = close[~close.index.duplicated(keep="last")].sort_index()
+                    self._save(ticker, close)
+                new_start = start if covered is None else min(start, pd.Timestamp(covered[0]))
+                new_end = known_end if covered is None else max(known_end, pd.Timestamp(covered[1]))
+                # Couverture écrite après le fichier de cours : une interruption entre les deux ne fait que retélécharger
+                self._write_coverage(ticker, new_start, new_end)
+
+        return close[(close.index >= start) & (close.index < end)].rename(ticker)
+
+    @traced("price_store.get_many")
+    def get_many(self, tickers, start, end, max_workers=8):
+        """Cours de clôture alignés (une colonne par ticker) sur [start, end), tickers servis en parallèle."""
+        return fetch_closes(self.get, tickers, start, end, max_workers=max_workers)
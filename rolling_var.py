@@ -0,0 +1,83 @@
+# ─────────────────────────────────────────────
+# VaR glissante (normale et historique) avec mise à jour incrémentale des fenêtres
+# ─────────────────────────────────────────────
+# Pour un titre (Series) ou un secteur poolé (DataFrame, une colonne par titre),
+# la fenêtre contient tous les rendements des `window` dernières séances.
+# - VaR normale : n, Σx et Σx² de la fenêtre sont obtenus par différence de
+#   sommes cumulées, soit O(1) par date.
+# - VaR historique : la fenêtre est maintenue triée (insertion/suppression par
+#   recherche dichotomique) au lieu d'être retriée à chaque date ; le quantile est
+#   interpolé linéairement comme np.percentile.
+# Les VaR sont exprimées en rendement (valeurs négatives), comme norm.ppf(0.05, mean, std).
+# min_periods : nombre minimal de rendements dans la fenêtre (sinon NaN), comme pandas.rolling.
+from bisect import bisect_left, insort
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import traced
+from parameters import LEVELS
+
+
+def _as_frame(returns):
+    return returns.to_frame() if isinstance(returns, pd.Series) else returns
+
+
+def rolling_normal_var(returns, window=250, levels=LEVELS, min_periods=2):
+    values = _as_frame(returns).to_numpy(dtype="float64")
+    valid = ~np.isnan(values)
+    x = np.where(valid, values, 0.0)
+    # Sommes cumulées par date (toutes colonnes confondues), précédées d'un zéro
+    cum = np.zeros((3, len(values) + 1))
+    cum[0, 1:] = np.cumsum(valid.sum(axis=1))
+    cum[1, 1:] = np.cumsum(x.sum(axis=1))
+    cum[2, 1:] = np.cumsum((x * x).sum(axis=1))
+    n, s1, s2 = cum[:, window:] - cum[:, :-window]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = s1 / n
+        std = np.sqrt(np.maximum(s2 - n * mean**2, 0.0) / (n - 1))
+    result = pd.DataFrame(index=returns.index)
+    for level in levels:
+        var = np.full(len(values), np.nan)
+        var[window - 1:] = np.where(n >= max(min_periods, 2), mean + std * NormalDist().inv_cdf(1 - level), np.nan)
+        result[f"VaR normale {level:.0%}"] = var
+    return result
+
+
+def rolling_historical_var(returns, window=250, levels=LEVELS, min_periods=1):
+    frame = _as_frame(returns)
+    qs = [1 - level for level in levels]
+    columns = [f"VaR historique {level:.0%}" for level in levels]
+    if frame.shape[1] == 1 and min_periods <= window:
+        # Une seule série : au plus un rendement par séance, le quantile glissant de pandas
+        # (même interpolation linéaire) donne le même résultat sans boucle Python
+        rolling = frame.iloc[:, 0].astype("float64").rolling(window, min_periods=max(min_periods, 1))
+        result = pd.DataFrame({c: rolling.quantile(q).to_numpy() for c, q in zip(columns, qs)}, index=returns.index)
+        result.iloc[:window - 1] = np.nan
+        return result
+    values = frame.to_numpy(dtype="float64")
+    rows = [row[~np.isnan(row)].tolist() for row in values]
+    var = np.full((len(values), len(levels)), np.nan)
+    ordered = []
+    for i, row in enumerate(rows):
+        for v in row:
+            insort(ordered, v)
+        if i >= window:
+            for v in rows[i - window]:
+                del ordered[bisect_left(ordered, v)]
+        if i >= window - 1 and ordered and len(ordered) >= min_periods:
+            for j, q in enumerate(qs):
+                # Interpolation linéaire entre statistiques d'ordre (méthode par défaut de np.percentile)
+                pos = (len(ordered) - 1) * q
+                lo = int(pos)
+                hi = min(lo + 1, len(ordered) - 1)
+                var[i, j] = ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+    return pd.DataFrame(var, index=returns.index, columns=columns)
+
+
+@traced("rolling_var.rolling_var")
+def rolling_var(returns, window=250, levels=LEVELS):
+    """VaR glissantes normale et historique, une colonne par méthode et par niveau."""
+    return pd.concat([rolling_normal_var(returns, window, levels),
+                      rolling_historical_var(returns, window, levels)], axis=1)
@@ -0,0 +1,87 @@
+import math
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest import ESTIMATORS, backtest_grid, backtest_targets, coverage_tests, exception_series
+from data_sources import synthetic_universe
+
+EXCEPTIONS = [0, 1, 1, 0, 0, 0, 1, 0, 0, 0]
+
+
+@pytest.fixture(scope="module")
+def log_return():
+    close, sectors = synthetic_universe(n_days=300, n_tickers=4, n_sectors=2, seed=7)
+    return np.log(close / close.shift(1)).iloc[1:], sectors
+
+
+def log_likelihood(failures, total, p):
+    successes = total - failures
+    return (failures * math.log(p) if failures else 0.0) + (successes * math.log(1 - p) if successes else 0.0)
+
+
+# Transitions comptées à la main sur EXCEPTIONS ; séance 4 non évaluée : paires (3, 4) et (4, 5) exclues
+@pytest.mark.parametrize("missing, n00, n01, n10, n11", [(None, 4, 2, 2, 1), (4, 2, 2, 2, 1)])
+def test_coverage_statistics_match_hand_counts(missing, n00, n01, n10, n11):
+    exceptions = np.array(EXCEPTIONS, dtype=bool)[:, None]
+    valid = np.ones_like(exceptions)
+    if missing is not None:
+        valid[missing] = False
+    n, x, p = int(valid.sum()), 3, 0.1
+    tests = coverage_tests(exceptions, valid, (1 - p,))
+
+    lr_uc = -2 * (log_likelihood(x, n, p) - log_likelihood(x, n, x / n))
+    pi0, pi1, pi = n01 / (n00 + n01), n11 / (n10 + n11), (n01 + n11) / (n00 + n01 + n10 + n11)
+    lr_ind = -2 * (log_likelihood(n01 + n11, n00 + n01 + n10 + n11, pi)
+                   - log_likelihood(n01, n00 + n01, pi0) - log_likelihood(n11, n10 + n11, pi1))
+    assert tests["Observations"][0] == n and tests["Exceptions"][0] == x
+    assert tests["Kupiec LR"][0] == pytest.approx(lr_uc, rel=1e-12)
+    assert tests["Christoffersen LR"][0] == pytest.approx(lr_ind, rel=1e-12)
+    assert tests["Couverture cond. LR"][0] == pytest.approx(lr_uc + lr_ind, rel=1e-12)
+    assert tests["Kupiec p"][0] == pytest.approx(math.erfc(math.sqrt(lr_uc / 2)), rel=1e-12)
+    assert tests["Couverture cond. p"][0] == pytest.approx(math.exp(-(lr_uc + lr_ind) / 2), rel=1e-12)
+
+
+def test_no_exception_gives_zero_independence_statistic():
+    exceptions = np.zeros((50, 1), dtype=bool)
+    tests = coverage_tests(exceptions, ~exceptions, (0.99,))
+    assert tests["Christoffersen LR"][0] == pytest.approx(0.0, abs=1e-12)
+    assert tests["Kupiec LR"][0] == pytest.approx(-2 * 50 * math.log(0.99), rel=1e-12)
+
+
+@pytest.mark.parametrize("method", list(ESTIMATORS))
+def test_forecast_uses_the_previous_sessions_only(log_return, method):
+    returns = backtest_targets(log_return[0], log_return[1])
+    t, window = 150, 40
+    forecast, exceptions, valid = exception_series(returns, window, method)
+    shocked = returns.copy()
+    shocked.iloc[t] = -0.5
+    shocked_forecast, shocked_exceptions, _ = exception_series(shocked, window, method)
+    # La prévision de la séance t ne voit pas le rendement de t ; celle de t + 1 l'intègre (VaR 99 % : la
+    # VaR historique 95 % peut rester inchangée quand une seule valeur de la fenêtre passe sous le quantile)
+    np.testing.assert_array_equal(shocked_forecast[:t + 1], forecast[:t + 1])
+    assert (shocked_forecast[t + 1, :, -1] != forecast[t + 1, :, -1]).all()
+    assert shocked_exceptions[t].all()
+    np.testing.assert_array_equal(exceptions, (returns.to_numpy()[:, :, None] < forecast) & valid)
+
+
+def test_normal_forecast_is_the_var_of_the_previous_window(log_return):
+    returns = backtest_targets(log_return[0])
+    window, levels = 40, (0.95, 0.99)
+    forecast, _, valid = exception_series(returns, window, "normal", levels)
+    assert not valid[:window].any()
+    z = np.array([NormalDist().inv_cdf(1 - level) for level in levels])
+    for t in (window, 100, len(returns) - 1):
+        past = returns.iloc[t - window:t]
+        expected = past.mean().to_numpy()[:, None] + past.std().to_numpy()[:, None] * z
+        np.testing.assert_allclose(forecast[t], expected, rtol=1e-10)
+
+
+def test_grid_does_not_depend_on_worker_count(log_return):
+    returns = backtest_targets(log_return[0], log_return[1])
+    one = backtest_grid(returns, windows=(40, 60, 120), max_workers=1)
+    pooled = backtest_grid(returns, windows=(40, 60, 120), max_workers=2)
+    pd.testing.assert_frame_equal(one, pooled)
+    assert len(one) == returns.shape[1] * len(ESTIMATORS) * 2 * 3
@@ -0,0 +1,32 @@
+import os
+
+import pandas as pd
+import pytest
+
+from batch import parse_periods, run
+
+PERIODS = [("2015-01-01", "2018-01-01"), ("2016-06-01", "2020-01-01")]
+GROUPINGS = {"split": {"X": ("AAA", "BBB"), "Y": ("CCC",)}, "single": {"ALL": ("AAA", "BBB", "CCC")}}
+
+
+def test_pool_gives_the_same_tables_as_one_process(tmp_path):
+    store = str(tmp_path / "store")
+    results = {}
+    for workers in (1, 2):
+        output = str(tmp_path / f"out{workers}")
+        results[workers] = run(PERIODS, GROUPINGS, "synthetic:3", store, output, "parquet", figures=workers == 2,
+                               max_workers=workers)
+    assert len(os.listdir(str(tmp_path / "out2" / "figures"))) == len(PERIODS) * len(GROUPINGS)
+    for one, pooled in zip(results[1], results[2]):
+        pd.testing.assert_frame_equal(one, pooled)
+    ticker_stats, sector_stats = results[1]
+    assert len(sector_stats) == len(PERIODS) * 3
+    assert set(ticker_stats["ticker"]) == {"AAA", "BBB", "CCC"}
+    saved = pd.read_parquet(str(tmp_path / "out2" / "sector_stats.parquet"))
+    pd.testing.assert_frame_equal(saved, sector_stats)
+
+
+@pytest.mark.parametrize("spec", ["2020-01-01", "2020-01-01:2021-01-01:2022-01-01", "2021-01-01:2020-01-01", "a:b"])
+def test_invalid_period_is_rejected(spec):
+    with pytest.raises(ValueError):
+        parse_periods([spec])
@@ -0,0 +1,30 @@
+import tracemalloc
+
+import numpy as np
+
+from benchmarks import measure, regressions
+
+
+def test_regressions_flag_time_and_peak_memory():
+    baseline = {"small": {"moments": {"seconds": 0.100, "peak_bytes": 10 * 2**20},
+                          "var": {"seconds": 0.100, "peak_bytes": 10 * 2**20}}}
+    report = {"small": {"moments": {"seconds": 0.101, "peak_bytes": 12 * 2**20},
+                        "var": {"seconds": 0.200, "peak_bytes": 10 * 2**20 + 1000},
+                        "new_stage": {"seconds": 9.0, "peak_bytes": 2**30}}}
+    assert regressions(report, baseline) == [
+        ("small", "moments", "peak_bytes", 10 * 2**20, 12 * 2**20),
+        ("small", "var", "seconds", 0.100, 0.200),
+    ]
+    assert regressions(report, baseline, memory_tolerance=0.5) == [("small", "var", "seconds", 0.100, 0.200)]
+
+
+def test_measure_keeps_tracing_started_elsewhere():
+    tracemalloc.start()
+    try:
+        seconds, peak, result = measure(lambda: np.ones(2**20), repeat=1)
+        assert tracemalloc.is_tracing()
+        assert peak >= 8 * 2**20
+    finally:
+        tracemalloc.stop()
+    measure(lambda: None, repeat=1)
+    assert not tracemalloc.is_tracing()
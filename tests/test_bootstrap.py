@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bootstrap import _batch_statistics, _draw_counts, _prepare, bootstrap_confidence_intervals
+from parallel import set_worker_data
+
+
+@pytest.mark.parametrize("method", ["iid", "block"])
+def test_batch_matches_explicit_resampling(method):
+    rng = np.random.default_rng(4)
+    values = rng.standard_t(4, (510, 3)) * 0.02
+    values[:100, 0] = np.nan
+    set_worker_data(_prepare(values))
+    seed = np.random.SeedSequence(9)
+    result = _batch_statistics((40, seed, method, 20))
+    counts = _draw_counts(np.random.default_rng(seed), len(values), 40, method, 20)
+    for r in range(40):
+        sample = np.repeat(values, counts[r], axis=0).ravel()
+        sample = pd.Series(sample[~np.isnan(sample)])
+        expected = [sample.mean(), sample.std(), sample.skew(), *np.percentile(sample, [5, 1])]
+        np.testing.assert_allclose(result[r, [0, 1, 2, 5, 6]], expected, rtol=1e-9, atol=1e-15)
+
+
+@pytest.mark.parametrize("n_days", [1, 5, 19, 20])
+def test_block_longer_than_period(n_days):
+    dates = pd.bdate_range("2024-01-02", periods=n_days)
+    log_return = pd.DataFrame(np.random.default_rng(1).normal(0, 0.01, (n_days, 2)), index=dates, columns=["A", "B"])
+    counts = _draw_counts(np.random.default_rng(0), n_days, 30, "block", 20)
+    assert (counts.sum(axis=1) == n_days).all()
+    result = bootstrap_confidence_intervals(log_return, ["A", "B"], n_resamples=200, method="block", max_workers=1)
+    assert result.loc["Mean", "Estimation"] == pytest.approx(log_return.stack().mean())
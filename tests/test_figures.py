@@ -0,0 +1,19 @@
+import numpy as np
+import pandas as pd
+
+from analytics import sector_table
+from figures import distribution_figure, figure_png
+
+
+def test_one_column_per_sector_and_empty_sector_panels():
+    dates = pd.bdate_range("2020-01-01", periods=300)
+    values = np.random.default_rng(2).standard_t(4, (300, 3)) * 0.01
+    values[:, 2] = np.nan
+    returns = pd.DataFrame(values, index=dates, columns=["A", "B", "C"])
+    stats, sketches = sector_table(returns, {"X": ("A",), "Y": ("B",), "Vide": ("C",)})
+    fig = distribution_figure(stats, sketches, title="test")
+    axes = fig.get_axes()
+    assert [ax.get_title() for ax in axes[:3]] == ["Histogramme X", "Histogramme Y", "Histogramme Vide"]
+    assert len(axes[4].get_lines()) == 5  # CDF + 2 VaR normales + 2 VaR historiques
+    assert [t.get_text() for t in axes[5].texts] == ["Aucun rendement sur la période"]
+    assert figure_png(fig).startswith(b"\x89PNG")
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import analytics
+from data_sources import synthetic_universe
+from incremental import RiskState
+from moments import STAT_COLUMNS, ticker_moments
+
+
+@pytest.fixture
+def universe():
+    close, sectors = synthetic_universe(n_days=1500, n_tickers=6, n_sectors=2, seed=3)
+    # Titre introduit en cours de période
+    close.iloc[:400, 1] = np.nan
+    return close, sectors
+
+
+def test_updates_match_batch(universe):
+    close, sectors = universe
+    state = RiskState(sectors)
+    for lo, hi in [(0, 600), (600, 601), (601, 1500)]:
+        state.update(close.iloc[lo:hi])
+    log_return = np.log(close / close.shift(1)).dropna(how="all")
+
+    pd.testing.assert_frame_equal(state.ticker_table(), ticker_moments(log_return, state.tickers), rtol=1e-10)
+    stats, _ = state.sector_table()
+    expected, _ = analytics.sector_table(log_return, sectors)
+    columns = STAT_COLUMNS + ["N", "IC bas", "IC haut", "VaR normale 95%", "VaR normale 99%"]
+    pd.testing.assert_frame_equal(stats[columns], expected[columns], rtol=1e-10)
+    # VaR historique lue dans des t-digests fusionnés dans un ordre différent
+    np.testing.assert_allclose(stats["VaR historique 99%"], expected["VaR historique 99%"], atol=1e-3)
+
+
+def test_update_ignores_known_sessions(universe):
+    close, sectors = universe
+    state = RiskState.from_prices(close.iloc[:800], sectors)
+    assert state.update(close.iloc[:800]) == 0
+    assert state.update(close.iloc[700:900]) == 100
+
+
+def test_save_load_round_trip(universe, tmp_path):
+    close, sectors = universe
+    state = RiskState.from_prices(close.iloc[:1000], sectors)
+    path = str(tmp_path / "state.npz")
+    state.save(path)
+    restored = RiskState.load(path)
+    assert restored.last_date == state.last_date
+    restored.update(close)
+    state.update(close)
+    pd.testing.assert_frame_equal(restored.sector_table()[0], state.sector_table()[0])
@@ -0,0 +1,32 @@
+import tracemalloc
+
+from instrumentation import Recorder, set_recorder, span
+
+
+def test_timing_does_not_start_tracemalloc():
+    recorder = set_recorder(Recorder())
+    try:
+        with span("stage"):
+            pass
+    finally:
+        set_recorder(None)
+    assert not tracemalloc.is_tracing()
+    assert recorder.records[0]["peak_bytes"] is None
+
+
+def test_tracing_stops_with_the_last_memory_recorder():
+    first, second = Recorder(memory=True), Recorder(memory=True)
+    first.close()
+    first.close()
+    assert tracemalloc.is_tracing()
+    second.close()
+    assert not tracemalloc.is_tracing()
+
+
+def test_unclosed_recorder_releases_tracing_when_destroyed():
+    with Recorder(memory=True):
+        pass
+    recorder = Recorder(memory=True)
+    assert tracemalloc.is_tracing()
+    del recorder
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from moments import STAT_COLUMNS, combine_central, central_moments, moments_from_central, sector_moments, ticker_moments
+from universe import ReturnsMatrix
+
+
+@pytest.fixture
+def returns():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.standard_t(4, (2000, 4)) * 0.02, columns=["A", "B", "C", "D"])
+    df.iloc[:300, 0] = np.nan
+    df["CONST"] = 0.01
+    df["LEVEL"] = 1e6 + rng.normal(0, 1e-3, len(df))
+    return df
+
+
+def pandas_moments(df):
+    return pd.DataFrame({"Mean": df.mean(), "Std": df.std(), "Skewness": df.skew(), "Kurtosis": df.kurt()})
+
+
+def test_ticker_moments_match_pandas(returns):
+    result = ticker_moments(returns)
+    pd.testing.assert_frame_equal(result[STAT_COLUMNS], pandas_moments(returns), rtol=1e-9, atol=1e-12)
+
+
+def test_constant_column_has_zero_moments(returns):
+    result = ticker_moments(returns, ["CONST"]).loc["CONST"]
+    assert result["Std"] == 0.0
+    assert result["Skewness"] == 0.0
+    assert result["Kurtosis"] == 0.0
+
+
+def test_low_volatility_series_keeps_its_moments():
+    # Sommes centrées très petites en valeur absolue mais bien au-dessus de l'erreur d'arrondi relative
+    series = pd.Series(np.random.default_rng(3).normal(0, 2.7e-5, 30))
+    result = ticker_moments(series.to_frame("X")).loc["X"]
+    assert result["Skewness"] == pytest.approx(series.skew(), rel=1e-9)
+    assert result["Kurtosis"] == pytest.approx(series.kurt(), rel=1e-9)
+
+
+def test_returns_matrix_matches_frame(returns):
+    frame = returns[["A", "B", "C", "D"]].astype("float32").astype("float64")
+    result = ticker_moments(ReturnsMatrix.from_frame(frame))
+    pd.testing.assert_frame_equal(result, ticker_moments(frame), rtol=1e-6)
+
+
+def test_sector_moments_match_stacked_pandas(returns):
+    sectors = {"X": ("A", "B"), "Y": ("C", "D", "CONST")}
+    result = sector_moments(returns, sectors)
+    for name, tickers in sectors.items():
+        pooled = pd.Series(returns[list(tickers)].to_numpy().ravel()).dropna()
+        assert result.loc[name, "N"] == len(pooled)
+        expected = pandas_moments(pooled.to_frame()).iloc[0]
+        np.testing.assert_allclose(result.loc[name, STAT_COLUMNS].to_numpy(dtype="float64"),
+                                   expected.to_numpy(), rtol=1e-9)
+
+
+def test_combine_central_matches_single_pass(returns):
+    values = returns[["A", "B", "C"]].to_numpy()
+    combined = combine_central(central_moments(values[:700]), central_moments(values[700:]))
+    for got, expected in zip(moments_from_central(combined), moments_from_central(central_moments(values))):
+        np.testing.assert_allclose(got, expected, rtol=1e-10)
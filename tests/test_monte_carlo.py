@@ -0,0 +1,50 @@
+import math
+
+import numpy as np
+import pytest
+
+from data_sources import synthetic_universe
+from monte_carlo import MODELS, _simulate, fit_model, monte_carlo_var
+
+
+@pytest.fixture(scope="module")
+def returns():
+    close, sectors = synthetic_universe(n_days=500, n_tickers=4, n_sectors=1, seed=2)
+    return np.log(close / close.shift(1)).iloc[1:], list(close.columns)
+
+
+def full_sample(log_return, tickers, model, n_scenarios, chunk_size, seed=0):
+    """Tous les scénarios, générés bloc par bloc avec les mêmes graines que monte_carlo_var."""
+    params = fit_model(log_return, tickers, model)
+    n_chunks = math.ceil(n_scenarios / chunk_size)
+    sizes = [chunk_size] * (n_chunks - 1) + [n_scenarios - chunk_size * (n_chunks - 1)]
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    return np.concatenate([_simulate(params, size, np.random.default_rng(s)) for size, s in zip(sizes, seeds)])
+
+
+@pytest.mark.parametrize("model", MODELS)
+@pytest.mark.parametrize("chunk_size", [7, 100, 5000])
+def test_merged_tails_give_exact_quantiles(returns, model, chunk_size):
+    log_return, tickers = returns
+    n_scenarios = 2003
+    scenarios = full_sample(log_return, tickers, model, n_scenarios, chunk_size)
+    for max_workers in (1, 2):
+        result = monte_carlo_var(log_return, tickers, model, n_scenarios, chunk_size=chunk_size, max_workers=max_workers)
+        for level in (0.95, 0.99):
+            var = np.percentile(scenarios, 100 * (1 - level))
+            assert result[f"VaR {level:.0%}"] == pytest.approx(var, rel=1e-12)
+            assert result[f"ES {level:.0%}"] == pytest.approx(scenarios[scenarios <= var].mean(), rel=1e-12)
+
+
+def test_result_does_not_depend_on_worker_count(returns):
+    log_return, tickers = returns
+    results = [monte_carlo_var(log_return, tickers, "student", 50_000, chunk_size=4000, max_workers=w) for w in (1, 2, 3)]
+    for result in results[1:]:
+        assert result.equals(results[0])
+
+
+def test_at_least_two_scenarios(returns):
+    log_return, tickers = returns
+    with pytest.raises(ValueError):
+        monte_carlo_var(log_return, tickers, n_scenarios=1)
+    assert monte_carlo_var(log_return, tickers, n_scenarios=2).notna().all()
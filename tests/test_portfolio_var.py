@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from data_sources import synthetic_universe
+from parameters import EWMA_LAMBDA
+from portfolio_var import _sample_covariance, ewma_covariance, ewma_portfolio_var
+
+
+def naive_ewma_variance(returns, weights, ewma_lambda=EWMA_LAMBDA):
+    """Récurrence séance par séance : Σ mise à jour là où les deux titres sont entre leur première et leur dernière
+    cotation, rendement manquant nul."""
+    returns = returns.dropna(how="all")
+    cov = np.nan_to_num(returns.cov().to_numpy())
+    quoted = returns.notna()
+    listed = (quoted.cummax() & quoted[::-1].cummax()[::-1]).to_numpy()
+    variance, covs = [], []
+    for r, in_listing in zip(returns.to_numpy(), listed):
+        valid = ~np.isnan(r)
+        w = np.where(valid, weights, 0.0)
+        w = w / w.sum()
+        covs.append(cov.copy())
+        variance.append(w @ cov @ w)
+        x = np.where(valid, r, 0.0)
+        both = np.outer(in_listing, in_listing)
+        cov = np.where(both, ewma_lambda * cov + (1 - ewma_lambda) * np.outer(x, x), cov)
+    return np.array(variance), np.array(covs)
+
+
+@pytest.fixture(params=["complete", "staggered", "scattered"])
+def returns(request):
+    close, _ = synthetic_universe(n_days=700, n_tickers=8, n_sectors=2, seed=5)
+    log_return = np.log(close / close.shift(1)).iloc[1:]
+    if request.param == "staggered":
+        # Introductions échelonnées, radiation, suspensions de cotation et séances isolées manquantes
+        log_return.iloc[:300, 0] = np.nan
+        log_return.iloc[:520, 3] = np.nan
+        log_return.iloc[650:, 2] = np.nan
+        log_return.iloc[100:160, 5] = np.nan
+        log_return.iloc[[10, 257, 258, 600], 6] = np.nan
+    if request.param == "scattered":
+        # Cotations manquantes au hasard : ensemble de titres cotés changeant presque chaque séance
+        log_return = log_return.mask(np.random.default_rng(1).random(log_return.shape) < 0.05)
+    return log_return
+
+
+def test_ewma_portfolio_variance_matches_naive_loop(returns):
+    weights = np.arange(1.0, returns.shape[1] + 1)
+    expected, _ = naive_ewma_variance(returns, weights)
+    result = ewma_portfolio_var(returns, list(returns.columns), dict(zip(returns.columns, weights)))
+    np.testing.assert_allclose(result["Volatilité EWMA"].to_numpy() ** 2, expected, rtol=1e-10, atol=1e-18)
+
+
+def test_ewma_covariance_matches_naive_loop(returns):
+    _, expected = naive_ewma_variance(returns, np.ones(returns.shape[1]))
+    np.testing.assert_allclose(ewma_covariance(returns.dropna(how="all")), expected, rtol=1e-10, atol=1e-18)
+
+
+def test_ewma_portfolio_variance_does_not_depend_on_block_size(returns):
+    result = ewma_portfolio_var(returns, list(returns.columns))
+    small = ewma_portfolio_var(returns, list(returns.columns), max_block_bytes=8 * 40 * (256 + returns.shape[1]))
+    np.testing.assert_allclose(small.to_numpy(), result.to_numpy(), rtol=1e-10)
+
+
+def test_sample_covariance_matches_pairwise_pandas(returns):
+    # Paires sans recouvrement ou d'une seule séance commune : covariance nulle
+    returns = returns.copy()
+    returns.iloc[:-1, 1] = np.nan
+    returns.iloc[:, 2] = np.nan
+    expected = np.nan_to_num(returns.cov().to_numpy())
+    np.testing.assert_allclose(_sample_covariance(returns), expected, rtol=1e-10, atol=1e-18)
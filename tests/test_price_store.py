@@ -0,0 +1,71 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from data_sources import SyntheticSource
+from price_store import PriceStore
+
+
+class CountingSource:
+    """Source hors ligne qui enregistre les plages demandées."""
+
+    def __init__(self):
+        self.source = SyntheticSource(seed=1)
+        self.calls = []
+
+    def __call__(self, ticker, start, end):
+        self.calls.append((ticker, start, end))
+        return self.source(ticker, start, end)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PriceStore(str(tmp_path), CountingSource())
+
+
+def test_served_from_disk_after_first_fetch(store):
+    first = store.get("AAA", "2020-01-01", "2021-01-01")
+    assert len(store.fetcher.calls) == 1
+    again = store.get("AAA", "2020-03-01", "2020-06-01")
+    assert len(store.fetcher.calls) == 1
+    pd.testing.assert_series_equal(again, first["2020-03-01":"2020-05-31"], check_freq=False)
+
+
+def test_only_missing_edges_are_fetched(store):
+    store.get("AAA", "2020-01-01", "2021-01-01")
+    close = store.get("AAA", "2019-06-01", "2021-06-01")
+    assert store.fetcher.calls[1:] == [("AAA", "2019-06-01", "2020-01-01"), ("AAA", "2021-01-01", "2021-06-01")]
+    expected = SyntheticSource(seed=1)("AAA", "2019-06-01", "2021-06-01")
+    pd.testing.assert_series_equal(close, expected, check_freq=False)
+
+
+def test_store_persists_across_instances(store, tmp_path):
+    store.get_many(["AAA", "BBB"], "2020-01-01", "2020-07-01")
+    reopened = PriceStore(str(tmp_path), CountingSource())
+    closes = reopened.get_many(["AAA", "BBB"], "2020-02-01", "2020-07-01")
+    assert reopened.fetcher.calls == []
+    assert list(closes.columns) == ["AAA", "BBB"]
+    assert closes.index.min() >= pd.Timestamp("2020-02-01")
+
+
+def test_concurrent_stores_keep_coverage_consistent(tmp_path):
+    # Deux instances sur le même répertoire (comme deux sessions de l'application), plages différentes
+    class SlowSource(CountingSource):
+        def __call__(self, ticker, start, end):
+            time.sleep(0.05)
+            return super().__call__(ticker, start, end)
+
+    stores = [PriceStore(str(tmp_path), SlowSource()) for _ in range(2)]
+    ranges = [("2020-01-01", "2021-01-01"), ("2021-01-01", "2022-01-01")]
+    threads = [threading.Thread(target=s.get, args=("AAA", *r)) for s, r in zip(stores, ranges)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    reopened = PriceStore(str(tmp_path), CountingSource())
+    close = reopened.get("AAA", "2020-01-01", "2022-01-01")
+    assert reopened.fetcher.calls == []
+    expected = SyntheticSource(seed=1)("AAA", "2020-01-01", "2022-01-01")
+    pd.testing.assert_series_equal(close, expected, check_freq=False)
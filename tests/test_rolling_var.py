@@ -0,0 +1,51 @@
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from rolling_var import rolling_historical_var, rolling_var
+
+
+@pytest.fixture
+def returns():
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame(rng.standard_t(4, (400, 3)) * 0.015, columns=["A", "B", "C"],
+                      index=pd.bdate_range("2020-01-01", periods=400))
+    df.iloc[:120, 1] = np.nan
+    df.iloc[200:210, 2] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("window", [1, 20, 250])
+def test_rolling_var_matches_naive_windows(returns, window):
+    result = rolling_var(returns, window=window)
+    values = returns.to_numpy()
+    for i in range(len(values)):
+        pooled = values[max(0, i - window + 1):i + 1].ravel()
+        pooled = pooled[~np.isnan(pooled)]
+        row = result.iloc[i]
+        if i < window - 1:
+            assert row.isna().all()
+            continue
+        for level in (0.95, 0.99):
+            assert row[f"VaR historique {level:.0%}"] == pytest.approx(np.percentile(pooled, 100 * (1 - level)))
+            if len(pooled) > 1:
+                expected = pooled.mean() + pooled.std(ddof=1) * NormalDist().inv_cdf(1 - level)
+                assert row[f"VaR normale {level:.0%}"] == pytest.approx(expected, rel=1e-9)
+
+
+def test_rolling_var_of_series(returns):
+    result = rolling_var(returns["A"], window=50)
+    expected = returns["A"].rolling(50).quantile(0.05)
+    np.testing.assert_allclose(result["VaR historique 95%"], expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize("min_periods", [1, 30, 50])
+def test_single_series_matches_sorted_window(returns, min_periods):
+    # Chemin rapide d'une seule série contre la fenêtre triée (colonne vide ajoutée)
+    for column in returns.columns:
+        padded = returns[[column]].assign(vide=np.nan)
+        fast = rolling_historical_var(returns[column], window=50, min_periods=min_periods)
+        expected = rolling_historical_var(padded, window=50, min_periods=min_periods)
+        np.testing.assert_allclose(fast.to_numpy(), expected.to_numpy(), rtol=1e-12)
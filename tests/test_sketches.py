@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from sketches import COMPRESSION, FixedHistogram, TDigest
+
+LEVELS = (0.01, 0.05)
+
+
+@pytest.fixture(scope="module")
+def values():
+    # Rendements à queues épaisses de 10 « titres », de volatilités différentes
+    rng = np.random.default_rng(7)
+    return rng.standard_t(3, (10, 20_000)) * np.linspace(0.005, 0.03, 10)[:, None]
+
+
+def rank_bound(n, q, compression=COMPRESSION):
+    """Borne de l'en-tête de sketches.py : moitié de 2 · n · (2π/δ) · √(q(1−q)) observations."""
+    return n * (2 * np.pi / compression) * np.sqrt(q * (1 - q))
+
+
+def assert_rank_error_within_bound(digest, data):
+    data = np.sort(data.ravel())
+    for q, estimate in zip(LEVELS, digest.quantile(LEVELS)):
+        rank = np.searchsorted(data, estimate)
+        assert abs(rank - q * (len(data) - 1)) <= rank_bound(len(data), q) + 1
+
+
+def test_tdigest_rank_error(values):
+    assert_rank_error_within_bound(TDigest().add(values), values)
+
+
+def test_tdigest_chunks_and_merge_order(values):
+    chunked = TDigest()
+    for chunk in np.array_split(values.ravel(), 50):
+        chunked.add(chunk)
+    assert_rank_error_within_bound(chunked, values)
+    digests = [TDigest().add(row) for row in values]
+    for order in (digests, digests[::-1], digests[3:] + digests[:3]):
+        merged = TDigest.merge(order)
+        assert merged.count == values.size
+        assert (merged.min, merged.max) == (values.min(), values.max())
+        assert_rank_error_within_bound(merged, values)
+
+
+def test_histogram_quantile_within_one_bin(values):
+    histograms = [FixedHistogram().add(row) for row in values]
+    merged = FixedHistogram.merge(histograms)
+    for q in (0.01, 0.05, 0.5, 0.95):
+        assert abs(merged.quantile(q) - np.percentile(values, 100 * q)) <= merged.width
@@ -0,0 +1,29 @@
+import io
+
+import pytest
+
+from universe import DEFAULT_SECTORS, load_sector_map
+
+
+def test_sector_map_sources(tmp_path):
+    path = tmp_path / "sectors.csv"
+    path.write_text("ticker,sector\nAAPL,Tech\nNEE,Utilities\nMSFT,Tech\n")
+    expected = {"Tech": ("AAPL", "MSFT"), "Utilities": ("NEE",)}
+    assert load_sector_map(str(path)) == expected
+    upload = io.BytesIO(b'{"Tech": ["AAPL", "MSFT"], "Utilities": ["NEE"]}')
+    upload.name = "upload.json"
+    assert load_sector_map(upload) == expected
+    assert load_sector_map() == DEFAULT_SECTORS
+
+
+@pytest.mark.parametrize("sectors", [{}, {"A": "AAPL"}, {"A": ["AAPL", 3]}, {"A": [""]}])
+def test_invalid_sector_map_is_rejected(sectors):
+    with pytest.raises(ValueError):
+        load_sector_map(sectors)
+
+
+def test_json_list_is_rejected(tmp_path):
+    path = tmp_path / "sectors.json"
+    path.write_text('["AAPL", "MSFT"]')
+    with pytest.raises(ValueError):
+        load_sector_map(str(path))
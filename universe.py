@@ -0,0 +1,152 @@
+# ─────────────────────────────────────────────
+# Univers de titres : correspondance secteurs → tickers et matrice de rendements compacte
+# ─────────────────────────────────────────────
+# La matrice de rendements stocke les log-rendements en float32 (séances × titres)
+# accompagnés d'un masque de validité : chaque titre garde tout son historique
+# (pas de suppression des séances où un autre titre manque, par exemple avant
+# l'introduction en bourse de META en 2012). Les calculs se font par blocs de
+# lignes, sans copie par secteur : mémoire et temps restent linéaires en
+# (séances × titres). La matrice peut être enregistrée sur disque puis relue en
+# mémoire mappée (np.load(mmap_mode="r")), ce qui permet de la partager entre
+# processus sans la recharger.
+import csv
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from moments import central_moments, combine_central
+
+DEFAULT_SECTORS = {
+    "GAFAM": ("AAPL", "MSFT", "META", "GOOG", "AMZN"),
+    "Utilities": ("NEE", "DUK", "SO", "D", "AEP"),
+}
+
+CHUNK_ROWS = 4096
+
+
+def load_sector_map(source=None):
+    """{secteur: (tickers…)} depuis un dict, un fichier JSON ({secteur: [tickers]}) ou CSV (colonnes ticker, sector).
+
+    source peut aussi être un fichier ouvert en binaire doté d'un attribut name (fichier
+    téléversé dans l'application Streamlit) : le format se déduit alors de son nom.
+    """
+    if source is None:
+        return dict(DEFAULT_SECTORS)
+    if isinstance(source, dict):
+        return _sector_tuples(source)
+    name = str(getattr(source, "name", source))
+    if hasattr(source, "read"):
+        source.seek(0)
+        text = source.read().decode("utf-8-sig")
+    elif name.endswith((".json", ".csv")):
+        with open(source, encoding="utf-8-sig") as f:
+            text = f.read()
+    if name.endswith(".json"):
+        return _sector_tuples(json.loads(text))
+    if name.endswith(".csv"):
+        return _sector_tuples(_sectors_from_csv(io.StringIO(text, newline="")))
+    raise ValueError(f"Format de correspondance secteurs inconnu : {name!r} (attendu : dict, .json ou .csv)")
+
+
+def _sector_tuples(sectors):
+    if not isinstance(sectors, dict) or not sectors:
+        raise ValueError("Correspondance secteurs vide ou invalide (attendu : {secteur: [tickers]})")
+    for name, tickers in sectors.items():
+        # Une chaîne est itérable : "AAPL" donnerait les tickers A, A, P, L
+        if not isinstance(tickers, (list, tuple)) or not all(isinstance(t, str) and t for t in tickers):
+            raise ValueError(f"Secteur {name!r} : liste de tickers attendue, reçu {tickers!r}")
+    return {name: tuple(tickers) for name, tickers in sectors.items()}
+
+
+def _sectors_from_csv(f):
+    sectors = {}
+    for row in csv.DictReader(f):
+        sectors.setdefault(row["sector"].strip(), []).append(row["ticker"].strip())
+    return sectors
+
+
+def universe_tickers(sectors):
+    """Tickers de tous les secteurs, sans doublon, dans l'ordre d'apparition."""
+    return list(dict.fromkeys(t for sector_tickers in sectors.values() for t in sector_tickers))
+
+
+class ReturnsMatrix:
+    def __init__(self, dates, tickers, values, mask):
+        self.dates = pd.DatetimeIndex(dates)
+        self.tickers = list(tickers)
+        self.values = values
+        self.mask = mask
+        self._position = {t: i for i, t in enumerate(self.tickers)}
+
+    @classmethod
+    def from_frame(cls, log_return):
+        values = log_return.to_numpy(dtype="float32", copy=True)
+        mask = ~np.isnan(values)
+        values[~mask] = 0.0
+        return cls(log_return.index, log_return.columns, values, mask)
+
+    @classmethod
+    def from_prices(cls, close):
+        """Log-rendements de chaque titre sur son propre historique (aucune séance supprimée globalement)."""
+        close = close.sort_index()
+        return cls.from_frame(np.log(close / close.shift(1)).iloc[1:])
+
+    # ── Enregistrement / relecture (mémoire mappée) ──
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "values.npy"), self.values)
+        np.save(os.path.join(path, "mask.npy"), self.mask)
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump({"dates": [d.strftime("%Y-%m-%d") for d in self.dates], "tickers": self.tickers}, f)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        mode = "r" if mmap else None
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        return cls(pd.to_datetime(meta["dates"]), meta["tickers"],
+                   np.load(os.path.join(path, "values.npy"), mmap_mode=mode),
+                   np.load(os.path.join(path, "mask.npy"), mmap_mode=mode))
+
+    # ── Accès ──
+    @property
+    def columns(self):
+        return pd.Index(self.tickers)
+
+    def __len__(self):
+        return len(self.dates)
+
+    def positions(self, tickers):
+        return np.array([self._position[t] for t in tickers], dtype=np.intp)
+
+    def window(self, start=None, end=None):
+        """Sous-matrice des séances de [start, end) (vue, sans copie des données)."""
+        lo = 0 if start is None else self.dates.searchsorted(pd.Timestamp(start))
+        hi = len(self.dates) if end is None else self.dates.searchsorted(pd.Timestamp(end))
+        return ReturnsMatrix(self.dates[lo:hi], self.tickers, self.values[lo:hi], self.mask[lo:hi])
+
+    def _chunks(self, tickers):
+        cols = self.positions(tickers)
+        for lo in range(0, len(self.dates), CHUNK_ROWS):
+            yield self.values[lo:lo + CHUNK_ROWS, cols], self.mask[lo:lo + CHUNK_ROWS, cols]
+
+    def central_moments(self, tickers=None):
+        """n, moyenne et sommes des écarts centrés (5, k) par titre, combinées en float64 bloc par bloc."""
+        tickers = self.tickers if tickers is None else list(tickers)
+        central = np.zeros((5, len(tickers)))
+        for values, mask in self._chunks(tickers):
+            central = combine_central(central, central_moments(np.where(mask, values, np.nan)))
+        return central
+
+    def pooled(self, tickers):
+        """Rendements valides des titres donnés, mis bout à bout (float32)."""
+        return np.concatenate([values[mask] for values, mask in self._chunks(list(tickers))] or [np.empty(0, "float32")])
+
+    def to_frame(self, tickers=None):
+        tickers = self.tickers if tickers is None else list(tickers)
+        cols = self.positions(tickers)
+        values = np.where(self.mask[:, cols], self.values[:, cols], np.nan)
+        return pd.DataFrame(values, index=self.dates, columns=tickers)